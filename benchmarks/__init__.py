@@ -0,0 +1 @@
+## This package contains scripts to measure the speed of the simulation. Run them from the repository folder, e.g. "python -m benchmarks.statistics_buffer".
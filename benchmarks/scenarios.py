@@ -0,0 +1,126 @@
+## Benchmark: speed of complete simulations (without animation) in standard store scenarios.
+## Usage: python -m benchmarks.scenarios [scenario ...] [--iterations n] [--engine clocked|events] [--seed n] [--output file.json]
+## Each scenario runs in its own process, so the peak memory (RSS) of one scenario does not include the others.
+
+
+# Modules to use in this file:
+from concurrent.futures import ProcessPoolExecutor  # One new process per scenario.
+from contextlib import redirect_stdout  # Hides the messages printed by the simulation.
+from time import perf_counter   # Precise timer.
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import sys
+from numpy.random import SeedSequence
+import environment  # Custom module: Simulation manager.
+import market       # Custom module: Arrival distributions and cashier schedules.
+from parameters import simulation_parameters
+
+def scale_arrivals(arrival_time: list, factor: float):
+    """
+    Multiply the arrival rate of an arrival distribution.
+
+    Args:
+        arrival_time (list): Format is [[t1, arrival_time], [t2, arrival_time], …, [tn, arrival_time]].
+        factor (float): Arrivals are factor times more frequent. Periods without arrivals (0) are kept.
+
+    Returns:
+        arrival_time (list)
+    """
+
+    return [[t, mean_time / factor] for t, mean_time in arrival_time]
+
+scenarios = {   # Parameters that replace the ones in parameters.py.
+    "saturday": {"arrival_time": market.Popular_Hours.saturday_modified, "dynamic_cashier_generation": True, "cashier_quantity": market.Quartiles.saturday},
+    "sunday": {"arrival_time": market.Popular_Hours.sunday, "dynamic_cashier_generation": True, "cashier_quantity": market.Quartiles.saturday},
+    "fixed_cashiers": {"arrival_time": market.Popular_Hours.saturday_modified, "dynamic_cashier_generation": False, "cashier_quantity": 5},
+    "stress": {"arrival_time": scale_arrivals(market.Popular_Hours.saturday_modified, 10), "dynamic_cashier_generation": False, "cashier_quantity": 9},
+    "hypermarket": {"arrival_time": scale_arrivals(market.Popular_Hours.saturday_modified, 20), "dynamic_cashier_generation": False, "cashier_quantity": 200,
+                    "layout": os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layouts", "hypermarket.json")},
+}
+
+def peak_rss():
+    """
+    Returns:
+        rss (int|None): Peak resident memory of this process in bytes. None if the system does not report it.
+    """
+
+    try:
+        import resource
+    except ImportError:     # Windows.
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024     # macOS reports bytes, Linux kilobytes.
+
+def run_scenario(name: str, iterations: int, engine: str, seed: int):
+    """
+    Run the iterations of a scenario one after another and measure each one.
+
+    Args:
+        name (str): Name of the scenario in scenarios.
+        iterations (int): Quantity of iterations.
+        engine (str): "clocked" or "events".
+        seed (int): Master seed.
+
+    Returns:
+        result (dict): Measurements of the scenario.
+    """
+
+    parameters = copy.deepcopy(simulation_parameters)
+    parameters.update(scenarios[name])
+    parameters.update(copy.deepcopy(environment.headless_parameters))     # Checkpoints, profiling and debug checks are not measured.
+    parameters.update({"iterations": iterations, "engine": engine, "seed": seed})
+
+    simulation = environment.Environment()
+    simulation.define_parameters(parameters)
+
+    iteration_seconds = []
+    simulated_seconds = 0
+    customers = 0
+    for iteration, seed_sequence in enumerate(SeedSequence(seed).spawn(iterations)):
+        start = perf_counter()
+        with redirect_stdout(io.StringIO()):
+            simulation.run_iteration(iteration, seed_sequence)
+        iteration_seconds.append(perf_counter() - start)
+        simulated_seconds += simulation.clock - simulation.start_clock
+        customers += simulation.customer_count
+
+    wall_seconds = sum(iteration_seconds)
+    return {
+        "iterations": iterations,
+        "wall_seconds": wall_seconds,
+        "seconds_per_iteration": wall_seconds / iterations,
+        "iteration_seconds": iteration_seconds,
+        "simulated_seconds": simulated_seconds,
+        "simulated_seconds_per_wall_second": simulated_seconds / wall_seconds,
+        "customers": customers,
+        "customers_per_second": customers / wall_seconds,
+        "peak_rss_bytes": peak_rss(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Speed of the simulation in standard store scenarios.")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(scenarios)}. Default is all.")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--engine", default="clocked", choices=["clocked", "events"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file where the results are also saved.")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in scenarios:
+            parser.error(f"unknown scenario \"{name}\"")
+
+    results = {"python": platform.python_version(), "platform": platform.platform(), "engine": args.engine, "seed": args.seed, "scenarios": {}}
+    for name in args.scenarios or scenarios:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results["scenarios"][name] = executor.submit(run_scenario, name, args.iterations, args.engine, args.seed).result()
+
+    output = json.dumps(results, indent=4)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
@@ -0,0 +1,45 @@
+## Benchmark: time to collect customer statistics with pandas row appends (previous approach) and with records.RecordBuffer.
+## Usage: python -m benchmarks.statistics_buffer [rows]
+
+
+# Modules to use in this file:
+from datetime import timedelta
+from time import perf_counter   # Precise timer.
+import json
+import sys
+import pandas as pd
+from records import RecordBuffer    # Custom module: Columnar statistics buffer.
+
+columns = ["Iteración", "Cliente ID", "Hora llegada", "Tiempo fila", "Tiempo atención", "Hora salida", "Tamaño carrito"]
+
+def generate_rows(n: int):
+    """
+    Generate n customer rows similar to the ones recorded by the simulation. Times are in seconds.
+    """
+    return [(1, i + 1, 25200 + 40 * i, i % 600, 4 * (i % 100), 25500 + 40 * i, i % 100) for i in range(n)]
+
+def pandas_loc(rows: list):
+    df = pd.DataFrame(data=None, columns=columns)
+    for row in rows:
+        df.loc[len(df)] = [row[0], row[1], str(timedelta(seconds=row[2])), row[3], row[4], str(timedelta(seconds=row[5])), row[6]]
+    return df
+
+def record_buffer(rows: list):
+    record = RecordBuffer({"Iteración": "int64", "Cliente ID": "int64", "Hora llegada": "timedelta64[s]", "Tiempo fila": "int64", "Tiempo atención": "int64", "Hora salida": "timedelta64[s]", "Tamaño carrito": "int64"})
+    for row in rows:
+        record.append(row)
+    return record.to_dataframe()
+
+def measure(function, rows: list):
+    start = perf_counter()
+    df = function(rows)
+    elapsed = perf_counter() - start
+    return {"rows": len(df), "seconds": elapsed, "rows_per_second": len(df) / elapsed}
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rows = generate_rows(n)
+
+    results = {"pandas_loc": measure(pandas_loc, rows), "record_buffer": measure(record_buffer, rows)}
+    results["speedup"] = results["pandas_loc"]["seconds"] / results["record_buffer"]["seconds"]
+    print(json.dumps(results, indent=4))
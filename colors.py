@@ -56,4 +56,26 @@ class Background(Text):
     This must be concatenated as Background.* at  the beginning of the text to modify.
     """
 
-    classic = "\033[0;30m\033[47m"
\ No newline at end of file
+    classic = "\033[0;30m\033[47m"
+
+class Cursor:
+    """
+    This class contains the ANSI codes to move the cursor and erase text in the terminal, used to redraw the screen without clearing it.
+    """
+
+    home = "\033[H"
+    clear_screen = "\033[2J"
+    clear_line = "\033[K"   # Erase from the cursor to the end of the line.
+
+    @staticmethod
+    def position(row: int, column: int):
+        """
+        Args:
+            row (int): Row of the terminal, starting at 1.
+            column (int): Column of the terminal, starting at 1.
+
+        Returns:
+            code (str): ANSI code to move the cursor to the row and column.
+        """
+
+        return f"\033[{row};{column}H"
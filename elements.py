@@ -69,7 +69,7 @@ class Wall(Element):
         self.y_location = y_location    # Primero se escoge el eje y,
         self.x_location = x_location    # Luego se escoge el eje x.
 
-        screen.layout[y_location][x_location] = self.sprite
+        screen.set_tile(x_location, y_location, self.sprite)
 
 class Queue(Element):
     """
@@ -116,7 +116,7 @@ class Queue(Element):
         self.y_location = y_location    # Primero se escoge el eje y,
         self.x_location = x_location    # Luego se escoge el eje x.
 
-        screen.layout[y_location][x_location] = self.sprite
+        screen.set_tile(x_location, y_location, self.sprite)
 
 class Void(Element):
     """
@@ -146,4 +146,9 @@ class Void(Element):
         self.y_location = y_location    # Primero se escoge el eje y,
         self.x_location = x_location    # Luego se escoge el eje x.
 
-        screen.layout[y_location][x_location] = self.sprite
\ No newline at end of file
+        screen.set_tile(x_location, y_location, self.sprite)
+
+
+# Shared elements (flyweights): tiles are drawn again with these instances instead of creating a new element each time.
+queue = Queue()
+void = Void()
@@ -3,13 +3,12 @@
 
 # Modules to use in this file:
 from math import inf as infinite    # Infinite number is used by Customer to chose Cashier.
-from numpy import nan
-from numpy import random as np_random
-from random import triangular
+from collections import deque, defaultdict   # Queue of customers of each cashier; statistics created on the first sample.
 import colors   # Custom module: Allows to modify printed text.
 import elements # Custom module: Provides simulation objects that agents can interact with.
 # import emoji        # Allows to print emojis.
 import functions    # Custom module: Containts additional functions that are not contained in classes.
+from metrics import StreamingStatistic  # Custom module: Mean, variance and quantiles of samples without storing them.
 
 class Entity:
     """
@@ -21,6 +20,8 @@ class Entity:
         environment (object): Environment where the agent interact.
     """
 
+    __slots__ = ("x_location", "y_location", "environment")   # Fixed attributes: no __dict__ per agent.
+
     def __init__(self,environment: object):
         self.x_location = 0
         self.y_location = 0
@@ -41,13 +42,20 @@ class Cashier(Entity):
     Attributes:
         icon (str): Printed icon. This is set by default as "🛃" and cannot be changed.
         cashier_id (int): Identification number. Default is 0. To assign an ID it is important to do it manually using Cashier.cashier_id = n.
-        customer_queue (list): List of customers that are in the queue of this cashier.
+        customer_queue (deque): Customers that are in the queue of this cashier. Use add_to_queue() and remove_from_queue() to modify it.
+        queue_items (int): Total items in the carts of the customers in customer_queue.
         current_customer (object): Customer that the cashier is serving.
         current_customer_complete_time (float): When the cashier is initialized, the value is 0.0 by default. This values is automatically calculated when the method call_customer() is used.
         scanned_items (int): Quantity of items that the cashier scanned from the current customer.
         status (str): Current status; it has two options 1) "available" and 2) "busy".
+        average_waiting_time (dict): StreamingStatistic of the mean waiting time in the queue (sampled every minute), by start of period. Periods without samples are not in the dictionary.
+        average_people_in_queue (dict): StreamingStatistic of the length of the queue (sampled every minute), by start of period. Periods without samples are not in the dictionary.
+        average_attention_time (dict): StreamingStatistic of the attention time of each customer, by start of period. Periods without samples are not in the dictionary.
     """
 
+    __slots__ = ("icon", "cashier_id", "average_scan_speed", "customer_queue", "queue_items", "current_customer", "current_customer_complete_time", "scanned_items", "status", "open_queue", "dynamic_scanning_time",
+                 "open_time", "close_time", "busy_time", "customer_served", "average_waiting_time", "average_people_in_queue", "average_attention_time")
+
     def __init__(self, environment: object, x_location: int, y_location: int, dynamic_scanning_time: bool, average_scan_speed = 4):
         self.icon = "🛃"
         self.x_location = x_location
@@ -55,7 +63,8 @@ class Cashier(Entity):
         self.environment = environment
         self.cashier_id = 0
         self.average_scan_speed = average_scan_speed
-        self.customer_queue = []
+        self.customer_queue = deque()
+        self.queue_items = 0    # Total items in the carts of the customers in the queue. It is updated when a customer enters or leaves the queue.
         self.current_customer = None
         self.current_customer_complete_time = 0   # This parameter is important to release the customer according to the internal clock of the environment.
         self.scanned_items = 0
@@ -70,63 +79,13 @@ class Cashier(Entity):
         self.busy_time = 0
         self.customer_served = 0
 
-        self.average_waiting_time = {
-            25200: [],
-            28800: [],
-            32400: [],
-            36000: [],
-            39600: [],
-            43200: [],
-            46800: [],
-            50400: [],
-            54000: [],
-            57600: [],
-            61200: [],
-            64800: [],
-            68400: [],
-            72000: [],
-            75600: [],
-            79200: []
-        }
-        self.average_people_in_queue = {
-            25200: [],
-            28800: [],
-            32400: [],
-            36000: [],
-            39600: [],
-            43200: [],
-            46800: [],
-            50400: [],
-            54000: [],
-            57600: [],
-            61200: [],
-            64800: [],
-            68400: [],
-            72000: [],
-            75600: [],
-            79200: []
-        }
-        self.average_attention_time = {
-            25200: [],
-            28800: [],
-            32400: [],
-            36000: [],
-            39600: [],
-            43200: [],
-            46800: [],
-            50400: [],
-            54000: [],
-            57600: [],
-            61200: [],
-            64800: [],
-            68400: [],
-            72000: [],
-            75600: [],
-            79200: []
-        }
-
-        environment.cashiers.append(self)   # Automatically appends the cashier to the environment's cashier list.
-        functions.generate_cashier_queue(environment.screen, self)   # Automatically creates the queue design for the cashier, from y_location to the main line.
+        # One accumulator of samples per period of the arrival distribution, created with the first sample of the period.
+        self.average_waiting_time = defaultdict(StreamingStatistic)
+        self.average_people_in_queue = defaultdict(StreamingStatistic)
+        self.average_attention_time = defaultdict(StreamingStatistic)
+
+        environment.activate_cashier(self)   # Automatically appends the cashier to the environment's cashier list.
+        functions.generate_cashier_queue(environment, self)   # Automatically creates the queue design for the cashier, from y_location to the main line.
 
     def spawn(self):
         """
@@ -136,7 +95,9 @@ class Cashier(Entity):
         if self.icon != "🛃":
             self.icon = "🛃"
 
-        self.environment.screen.layout[self.y_location][self.x_location] = self.icon    # This code change the blank space in the coordinates of Screen.layout by the agent icon.
+        self.environment.vacate(self.x_location, self.y_location)
+        if self.environment.screen is not None:
+            self.environment.screen.set_tile(self.x_location, self.y_location, self.icon)    # This code change the blank space in the coordinates of Screen.layout by the agent icon.
 
     def call_customer(self):
         """
@@ -150,9 +111,7 @@ class Cashier(Entity):
                 self.current_customer = customer
 
                 if self.dynamic_scanning_time:
-                    self.current_customer_complete_time = self.environment.clock
-                    for i in range(0,self.current_customer.cart_size):
-                        self.current_customer_complete_time += np_random.exponential(self.average_scan_speed)
+                    self.current_customer_complete_time = self.environment.clock + self.environment.random.exponential_sum(self.average_scan_speed, self.current_customer.cart_size)   # Each item has an exponential scanning time.
                 else:
                     self.current_customer_complete_time = self.environment.clock + (self.current_customer.cart_size * self.average_scan_speed)   # Calculate the time it will takes the cashier to scan all the items in the customer's cart. It multiplies the item quantity and its scan speed.
                 
@@ -163,7 +122,7 @@ class Cashier(Entity):
                 self.status = "busy"    # Change its own status to "busy".
 
                 self.current_customer.paying_arrival_time = self.environment.clock
-                self.environment.waiting_times.append(self.current_customer.paying_arrival_time-self.current_customer.queue_arrival_time)
+                self.environment.waiting_times.add(self.current_customer.paying_arrival_time-self.current_customer.queue_arrival_time)
 
     def release_customer(self):
         """
@@ -172,15 +131,42 @@ class Cashier(Entity):
 
         self.status = "available"   # Change own status to "available".
         self.current_customer.status = "exiting"    # Change customer's status to "exiting".
-        self.customer_queue.remove(self.current_customer)   # Remove current customer from the queue.
+        self.remove_from_queue(self.current_customer)   # Remove current customer from the queue.
         self.current_customer = None    # Overwrite current customer to None.
         self.customer_served += 1
 
+    def add_to_queue(self, customer: object):
+        """
+        Add a customer at the end of the queue.
+
+        Args:
+            customer (object): Customer that enters the queue.
+        """
+
+        self.customer_queue.append(customer)
+        self.queue_items += customer.cart_size
+
+    def remove_from_queue(self, customer: object):
+        """
+        Remove a customer from the queue.
+
+        Args:
+            customer (object): Customer that leaves the queue.
+        """
+
+        if self.customer_queue[0] is customer:  # Usually the customer that leaves is the first one.
+            self.customer_queue.popleft()
+        else:
+            self.customer_queue.remove(customer)
+        self.queue_items -= customer.cart_size
+
     def disappear(self):
         if self.icon != "  ":
             self.icon = "  "
 
-        self.environment.screen.layout[self.y_location][self.x_location] = self.icon
+        self.environment.vacate(self.x_location, self.y_location)
+        if self.environment.screen is not None:
+            self.environment.screen.set_tile(self.x_location, self.y_location, self.icon)
 
 
 class Customer(Entity):
@@ -196,19 +182,35 @@ class Customer(Entity):
         x_location (int): Object location in the x axis of screen layout.
         y_location (int): Object location in the y axis of screen layout.
         icon (str): Printed icon. This is set by default as "👤" and cannot be changed.
-        customer_id (int): Identification number. Default is 0. To assign an ID it is important to do it manually using Customer.customer_id = n.
-        cart_size (int): Quantity of items in the cart. This value is randomly generated between 1 and 50.
+        customer_id (int): Identification number. Default is 0. To assign an ID it is important to do it manually using Customer.customer_id = n, before adding the customer to the environment's CustomerRegistry.
+        cart_size (int): Quantity of items in the cart. This value is randomly generated between minimum_cart_items and maximum_cart_items (triangular distribution).
         scanned_items (int): Quantity of items that the cashier scanned from the current customer.
-        status (str): Current status; options 1) "spawned", 2) "moving to queue", 3) "in queue", 4) "paying", 5) "exiting", and 6) "finished".
+        status (str): Current status; options 1) "spawned", 2) "moving to queue", 3) "in queue", 4) "changing queue", 5) "ready", 6) "paying", 7) "exiting", and 8) "finished". When it changes, the customer is moved to the group of the new status in the environment's CustomerRegistry.
     """
 
+    __slots__ = ("customer_id", "customer_kind", "cart_size", "_status", "chosen_cashier", "arrival_time", "queue_arrival_time", "paying_arrival_time", "attention_time_span", "exit_time")
+
+    icon = "👤"     # Shared by every customer.
+
     def __init__(self, environment: object, customer_kind: str, minimum_cart_items=1, maximum_cart_items=100):
-        self.icon = "👤"
-        self.environment = environment
+        super().__init__(environment)
+        self.reset(customer_kind, minimum_cart_items, maximum_cart_items)
+
+    def reset(self, customer_kind: str, minimum_cart_items=1, maximum_cart_items=100):
+        """
+        Set the customer as a new one, so a customer that left the supermarket can be used again (see Environment.new_customer()).
+
+        Args:
+            customer_kind (str): "regular" or "observer".
+            minimum_cart_items (int): Minimum quantity of items in the cart.
+            maximum_cart_items (int): Maximum quantity of items in the cart.
+        """
+
+        environment = self.environment
         self.customer_id = 0
         self.customer_kind = customer_kind  # Tipos: regular y observer
-        self.cart_size = round(triangular(minimum_cart_items,maximum_cart_items))
-        self.status = "spawned"
+        self.cart_size = environment.random.cart_size(minimum_cart_items,maximum_cart_items)
+        self._status = "spawned"
         self.chosen_cashier = None
         # Statistics
         self.arrival_time = 0
@@ -217,11 +219,18 @@ class Customer(Entity):
         self.attention_time_span = 0
         self.exit_time = 0
 
-        environment.customers.append(self)  # Assigns customer to environment list.
-    
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, status: str):
+        self.environment.customers.move(self, self._status, status)
+        self._status = status
+
     def spawn(self, x_location: int, y_location: int):
         """
-        Set the customer in the screen's layout. It is important to execute this method before printing the screen.
+        Set the customer in the given tile. If the environment has a screen, the customer is also set in the screen's layout. It is important to execute this method before printing the screen.
 
         Args:
             x_location (int): Object location in the x axis of screen layout.
@@ -231,7 +240,9 @@ class Customer(Entity):
         self.x_location = x_location
         self.y_location = y_location
 
-        self.environment.screen.layout[y_location][x_location] = self.icon  # This code change the blank space in the coordinates of Screen.layout by the agent icon.
+        self.environment.occupy(x_location, y_location)
+        if self.environment.screen is not None:
+            self.environment.screen.set_tile(x_location, y_location, self.icon)  # This code change the blank space in the coordinates of Screen.layout by the agent icon.
 
     def choose_queue(self):
         """
@@ -251,15 +262,11 @@ class Customer(Entity):
             case "observer":
                 items_in_queue_size = infinite
                 for cashier in self.environment.cashiers:
-                    cart_size = 0
                     if cashier.open_queue:
-                        for customer in cashier.customer_queue:
-                            cart_size += customer.cart_size
-
-                        if cart_size < items_in_queue_size:
-                            items_in_queue_size = cart_size
+                        if cashier.queue_items < items_in_queue_size:
+                            items_in_queue_size = cashier.queue_items
                             queue = cashier
-        queue.customer_queue.append(self)
+        queue.add_to_queue(self)
         self.chosen_cashier = queue
 
         self.status = "moving to queue"
@@ -275,8 +282,9 @@ class Customer(Entity):
         elif self.x_location == self.chosen_cashier.x_location + 1:   # When the customer arrives to cashier's x axis, change their status to "in queue". 
             self.status = "in queue"
         else :  # Move the customer 1 step until they arrives to cashier's x axis and restore the original sprite in the last step.
-            elements.Queue().set_in_screen(self.environment.screen, self.x_location, self.y_location)
-            self.spawn(self.x_location + 1, self.y_location)
+            direction = 1 if self.chosen_cashier.x_location + 1 > self.x_location else -1  # Entrances can be at both sides of the lane.
+            self.environment.clear_tile(self.x_location, self.y_location, elements.queue)
+            self.spawn(self.x_location + direction, self.y_location)
 
         self.queue_arrival_time = self.environment.clock
     
@@ -288,10 +296,10 @@ class Customer(Entity):
 
         if self.y_location == self.chosen_cashier.y_location:  # If customer arrived cashier's y axis, change their status to "ready (to pay)".
             self.status = "ready"
-        elif self.environment.screen.layout[self.y_location - 1][self.x_location] == self.icon:  # If there is other customer in front, ignore.
+        elif self.environment.is_occupied(self.x_location, self.y_location - 1):  # If there is other customer in front, ignore.
             pass
         else:  # Move the customer 1 step until they arrives to cashier's y axis and restore the original sprite in the last step.
-            elements.Queue().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+            self.environment.clear_tile(self.x_location, self.y_location, elements.queue)
             self.spawn(self.x_location, self.y_location - 1)
     
     def exit_store_clocked(self):
@@ -301,31 +309,27 @@ class Customer(Entity):
         """
 
         if self.y_location == 0:
-            elements.Void().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+            self.environment.clear_tile(self.x_location, self.y_location, elements.void)
             self.status = "finished"
         else:
-            elements.Void().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+            self.environment.clear_tile(self.x_location, self.y_location, elements.void)
             self.spawn(self.x_location, self.y_location - 1)
 
     def determine_next_queues(self):
-        right = infinite
-        left = -1
-
-        right_cashier = self.chosen_cashier
-        left_cashier = self.chosen_cashier
+        """
+        Find the nearest open queues at the left and at the right of the chosen cashier, using the sorted index of open queues of the environment.
 
-        for cashier in self.environment.cashiers:
-            if cashier != self.chosen_cashier and cashier.open_queue:
-                if self.chosen_cashier.x_location < cashier.x_location < right:
-                    right = cashier.x_location
-                    right_cashier = cashier
-                if self.chosen_cashier.x_location > cashier.x_location > left:
-                    left = cashier.x_location
-                    left_cashier = cashier
+        Returns:
+            cashiers (list): [left cashier, right cashier]. If there is no open queue at one side, the chosen cashier is returned for that side.
+        """
 
-        return [left_cashier,right_cashier]
+        return self.environment.neighbor_queues(self.chosen_cashier)
 
     def search_different_queue(self):
+        profiler = self.environment.profiler
+        if profiler is not None:
+            profiler.count("queue switch attempts")
+
         queue = self.chosen_cashier
         next_cashiers = self.determine_next_queues()
 
@@ -338,29 +342,22 @@ class Customer(Entity):
                         queue_size = len(cashier.customer_queue)
                         queue = cashier
             case "observer":
-                items_in_queue_size = 0
-                #original_items_in_queue_size = 0
-                for customer in self.chosen_cashier.customer_queue:
-                    if customer != self :
-                        items_in_queue_size += customer.cart_size
-                        #original_items_in_queue_size += customer.cart_size
+                items_in_queue_size = self.chosen_cashier.queue_items - self.cart_size    # Items in front of this customer.
 
                 for cashier in next_cashiers:
                     if cashier != self.chosen_cashier:
-                        cart_size = 0
-                        for customer in cashier.customer_queue:
-                            cart_size += customer.cart_size
-
-                        if cart_size < items_in_queue_size:
-                            items_in_queue_size = cart_size
+                        if cashier.queue_items < items_in_queue_size:
+                            items_in_queue_size = cashier.queue_items
                             queue = cashier
         
         if queue != self.chosen_cashier:
-            self.chosen_cashier.customer_queue.remove(self)
-            queue.customer_queue.append(self)
+            self.chosen_cashier.remove_from_queue(self)
+            queue.add_to_queue(self)
             self.chosen_cashier = queue
 
             self.status = "changing queue"
+            if profiler is not None:
+                profiler.count("queue switches")
     
     def change_queue_clocked(self):
         if self.x_location <= self.chosen_cashier.x_location:
@@ -368,26 +365,24 @@ class Customer(Entity):
         else:
             direction = -1
 
-        queues_x_locations = []
-        for cashier in self.environment.cashiers:
-            queues_x_locations.append(cashier.x_location + 1)
+        queues_x_locations = self.environment.lane_x_locations
 
-        if self.environment.screen.layout[self.y_location][self.x_location + direction] == self.icon:
-            if self.y_location + 1 == len(self.environment.screen.layout) - 1:
+        if self.environment.is_occupied(self.x_location + direction, self.y_location):
+            if self.y_location + 1 == self.environment.height - 1:
                 pass
             elif self.x_location in queues_x_locations:    
-                elements.Queue().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+                self.environment.clear_tile(self.x_location, self.y_location, elements.queue)
                 self.spawn(self.x_location, self.y_location + 1)
             else:
-                elements.Void().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+                self.environment.clear_tile(self.x_location, self.y_location, elements.void)
                 self.spawn(self.x_location, self.y_location + 1)
 
         else:
-            if self.x_location in queues_x_locations or self.y_location == len(self.environment.screen.layout) - 2:    
-                elements.Queue().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+            if self.x_location in queues_x_locations or self.y_location == self.environment.height - 2:    
+                self.environment.clear_tile(self.x_location, self.y_location, elements.queue)
                 self.spawn(self.x_location + direction, self.y_location)
             else:
-                elements.Void().set_in_screen(self.environment.screen, self.x_location, self.y_location)
+                self.environment.clear_tile(self.x_location, self.y_location, elements.void)
                 self.spawn(self.x_location + direction, self.y_location)
         
         if self.x_location == self.chosen_cashier.x_location + 1:
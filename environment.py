@@ -4,14 +4,67 @@
 # Modules to use in this file:
 from datetime import timedelta, datetime
 from entities import Customer           # To create customer agents.
-from math import inf as infinite
-from numpy import mean, nan, isnan
-from numpy import random as np_random
-from time import sleep,time             # Regulates simulation's internal clock.
+from bisect import bisect_left, bisect_right, insort  # Sorted indexes of periods and cashiers.
+from heapq import heappush, heappop     # Event calendar of the "events" engine.
+from concurrent.futures import ProcessPoolExecutor  # Runs iterations in parallel processes.
+from itertools import repeat
+from math import inf as infinite, ceil, floor
+from time import sleep, time, perf_counter  # Regulates simulation's internal clock.
+import sys                              # Writes each frame of the animation at once.
+import gzip                             # Compresses the checkpoints.
+import pickle                           # Saves the state of the simulation in the checkpoints.
+import copy
 import colors
 #import emoji       # Allows printing emojis.
 import functions    # Custom module: Useful functions
-import pandas as pd
+from randomness import RandomStream # Custom module: Random numbers of each iteration.
+from records import RecordBuffer    # Custom module: Stores the statistics while the simulation runs.
+from metrics import StreamingStatistic  # Custom module: Mean, variance and quantiles of samples without storing them.
+import exporters    # Custom module: Saves the statistics in files.
+from profiling import PhaseProfiler     # Custom module: Measures the phases of the simulation loop.
+from result_cache import ResultCache    # Custom module: Saves the statistics of finished simulations.
+from layout import StoreLayout          # Custom module: Logical model of the supermarket (lanes and entrances).
+
+default_parameters = {  # Parameters of the simulation and their default values (see define_parameters()). Every parameter is an attribute of Environment; their current values are sent to the parallel workers and saved in the result cache key.
+    # Running parameters
+    "print_animation": False,
+    "time_scale": 0.005,
+    "frames_per_second": 30,
+    "dynamic_arrival_time": False,
+    "dynamic_cashier_generation": False,
+    "dynamic_scanning_time": False,
+    "customer_quantity": infinite,
+    "simulation_time": infinite,
+    "arrival_time_distribution": "exponential",
+    "iterations": 1,
+    "engine": "clocked",
+    "workers": 1,
+    "seed": None,
+    "check_invariants": False,
+    "export_format": "excel",
+    "export_chunk_size": 4096,
+    "profile": False,
+    "checkpoint_interval": None,
+    "checkpoint_times": [],
+    "checkpoint_file": "checkpoint-{iteration}-{clock}.pkl.gz",
+    "result_cache": None,
+    "result_cache_size": 2 ** 30,
+    "bypass_cache": False,
+
+    # Fixed parameters
+    "arrival_time": 1,
+    "scanning_time": 3,
+    "observer_customer_probability": 0.1,
+    "cashiers_y_axis": 15,
+    "layout": None,
+    "minimum_cart_items": 1,
+    "maximum_cart_items": 100,
+
+    # Variable parameters
+    "cashier_quantity": 5,
+}
+
+headless_parameters = {"print_animation": False, "workers": 1, "export_format": None, "profile": False, "check_invariants": False, "checkpoint_interval": None, "checkpoint_times": [], "result_cache": None}   # Parameters of the simulations run by other tools (parameter sweeps, staffing optimizer, benchmarks): no animation, files, checkpoints, result cache or debug checks, whatever parameters.py says.
 
 class Environment:
     """
@@ -20,75 +73,78 @@ class Environment:
 
     Args:
         time_scale (float): Value must be greater than 0. Greater value means slower simulation.
+        frames_per_second (float): Frames printed per second of real time when the animation is printed.
 
     Attributes:
-        screen (object): Screen  (layout) that displays the objects in the simulation.
+        screen (object): Screen  (layout) that displays the objects in the simulation. It is None when the simulation runs without animation.
+        width (int): Width of the supermarket in tiles. If a screen is created, its width is used; if the parameter layout is given, the width of the layout is used.
+        height (int): Height of the supermarket in tiles. If a screen is created, its height is used; if the parameter layout is given, the height of the layout is used.
+        store (object): StoreLayout of the current iteration: lanes of the cashiers, entrances and walking distances (see build_store()).
+        occupancy (bytearray): One byte per tile (index y * width + x); 1 where a customer is standing. Agents use it through is_occupied(), occupy() and vacate() to know if they can move, so the simulation does not depend on the screen.
+        random (object): RandomStream of the current iteration. Every random number of the simulation is taken from it.
+        exporter (object): Exporter that saves the statistics in files (see export_format). None if no file is saved.
+        profiler (object): PhaseProfiler that measures the phases of the simulation loop (see profile). None if profile is False.
         clock (float): Internal clock.
-        cashiers (list): List of cashiers in the supermarket queue simulation.
+        cashiers (list): List of cashiers in the supermarket queue simulation. Use activate_cashier() and deactivate_cashier() to modify it.
+        lane_x_locations (set): X locations of the queues (lanes) of the cashiers in the cashiers list.
+        open_queue_x_locations (list): Sorted x locations of the cashiers whose queue is open. Use set_queue_open() to open or close a queue.
+        open_queue_cashiers (dict): Cashier with open queue in each x location of open_queue_x_locations.
         customer_count (int): Customer quantity that the simulation has created.
-        customer (list): List of customer in the supermarket queue simulation.
+        customers (object): CustomerRegistry with the customers in the supermarket queue simulation, grouped by status.
+        customer_pool (list): Customers that left the supermarket. They are used again for new arrivals, in this and the next iterations.
+        next_checkpoint (float): Time of the internal clock when the next checkpoint is saved (see checkpoint_interval and checkpoint_times). Infinite if no more checkpoints are saved in this iteration.
+        last_checkpoint (str|None): Path of the last checkpoint saved.
+        cache (object): ResultCache where the statistics of this simulation are saved (see result_cache). None if they are not saved.
+        cache_key (str|None): Key of the statistics of this simulation in the cache.
     """
 
     def __init__(self):
         # Environment properties
         self.screen = None
+        self.width = 30
+        self.height = 30
+        self.occupancy = bytearray(self.width * self.height)
+        self.store = None
         self.clock = 0
         self.cashiers = []
         self.inactive_cashiers = []
+        self.lane_x_locations = set()
+        self.open_queue_x_locations = []
+        self.open_queue_cashiers = {}
         self.customer_count = 0
-        self.customers = []
-        self.waiting_times = []
+        self.customers = CustomerRegistry()
+        self.customer_pool = []
+        self.waiting_times = StreamingStatistic()
         self.second_counter = 0
         self.i = 0
+        self.calendar = None
+        self.random = None
+        self.interrupted = False    # True if an iteration was stopped with CTRL+C; its statistics are incomplete.
 
-        # Running parameters
-        self.print_animation = False
-        self.time_scale = 0.005
-        self.dynamic_arrival_time = False
-        self.dynamic_cashier_generation = False
-        self.dynamic_scanning_time = False
-        self.customer_quantity = infinite
-        self.simulation_time = infinite
-        self.arrival_time_distribution = "exponential"
-        self.iterations = 1
-
-        # Fixed parameters
-        self.arrival_time = 1
-        self.scanning_time = 3
-        self.observer_customer_probability = 0.1
-        self.cashiers_y_axis = 15
-        self.minimum_cart_items = 1
-        self.maximum_cart_items = 100
-
-        # Variable parameters:
-        self.cashier_quantity = 5
-
-        self.statistics = {
-            "cashier_usage": pd.DataFrame(data=None, columns=["Iteración", "Cajero ID", "Hora apertura", "Hora cierre", "Tiempo ocupado", "Clientes atendidos"]),
-            "customers": pd.DataFrame(data=None, columns=["Iteración", "Cliente ID", "Hora llegada", "Tiempo fila", "Tiempo atención", "Hora salida", "Tamaño carrito"]),
-            "cashier_per_hour": pd.DataFrame(data=None, columns=["Iteración","Cajero ID", "Hora inicio", "Hora fin", "Tiempo promedio fila", "Longitud promedio fila", "Tiempo promedio atención"])
-        }
+        # Parameters
+        for key, value in default_parameters.items():
+            setattr(self, key, copy.deepcopy(value))    # Lists are not shared between environments.
+
+        self.profiler = None
+        self.exporter = None
+        self.next_checkpoint = infinite
+        self.last_checkpoint = None
+        self.seed_sequences = []
+        self.cache = None
+        self.cache_key = None
+        self.cashier_schedule = []
+        self.cashier_periods = None
+        self.statistics_periods = TimeBuckets([[h * 3600, None] for h in range(0, 25)])
 
-        self.statistics["cashier_usage"]["Iteración"] = self.statistics["cashier_usage"]["Iteración"].astype("int64")
-        self.statistics["cashier_usage"]["Cajero ID"] = self.statistics["cashier_usage"]["Cajero ID"].astype("int64")
-        self.statistics["cashier_usage"]["Hora apertura"] = self.statistics["cashier_usage"]["Hora apertura"].astype("timedelta64[ns]")
-        self.statistics["cashier_usage"]["Hora cierre"] = self.statistics["cashier_usage"]["Hora cierre"].astype("timedelta64[ns]")
-        self.statistics["cashier_usage"]["Tiempo ocupado"] = self.statistics["cashier_usage"]["Tiempo ocupado"].astype("int64")
-        self.statistics["cashier_usage"]["Clientes atendidos"] = self.statistics["cashier_usage"]["Clientes atendidos"].astype("int64")
-        self.statistics["customers"]["Iteración"] = self.statistics["customers"]["Iteración"].astype("int64")
-        self.statistics["customers"]["Cliente ID"] = self.statistics["customers"]["Cliente ID"].astype("int64")
-        self.statistics["customers"]["Hora llegada"] = self.statistics["customers"]["Hora llegada"].astype("timedelta64[ns]")
-        self.statistics["customers"]["Tiempo fila"] = self.statistics["customers"]["Tiempo fila"].astype("int64")
-        self.statistics["customers"]["Tiempo atención"] = self.statistics["customers"]["Tiempo atención"].astype("int64")
-        self.statistics["customers"]["Hora salida"] = self.statistics["customers"]["Hora salida"].astype("timedelta64[ns]")
-        self.statistics["customers"]["Tamaño carrito"] = self.statistics["customers"]["Tamaño carrito"].astype("int64")
-        self.statistics["cashier_per_hour"]["Iteración"] = self.statistics["cashier_per_hour"]["Iteración"].astype("int64")
-        self.statistics["cashier_per_hour"]["Cajero ID"] = self.statistics["cashier_per_hour"]["Cajero ID"].astype("int64")
-        self.statistics["cashier_per_hour"]["Hora inicio"] = self.statistics["cashier_per_hour"]["Hora inicio"].astype("timedelta64[ns]")
-        self.statistics["cashier_per_hour"]["Hora fin"] = self.statistics["cashier_per_hour"]["Hora fin"].astype("timedelta64[ns]")
-        self.statistics["cashier_per_hour"]["Tiempo promedio fila"] = self.statistics["cashier_per_hour"]["Tiempo promedio fila"].astype("int64")
-        self.statistics["cashier_per_hour"]["Longitud promedio fila"] = self.statistics["cashier_per_hour"]["Longitud promedio fila"].astype("int64")
-        self.statistics["cashier_per_hour"]["Tiempo promedio fila"] = self.statistics["cashier_per_hour"]["Tiempo promedio fila"].astype("int64")
+        self.records = {    # Rows are added here while the simulation runs. Times are in seconds.
+            "cashier_usage": RecordBuffer({"Iteración": "int64", "Cajero ID": "int64", "Hora apertura": "timedelta64[s]", "Hora cierre": "timedelta64[s]", "Tiempo ocupado": "int64", "Clientes atendidos": "int64"}),
+            "customers": RecordBuffer({"Iteración": "int64", "Cliente ID": "int64", "Hora llegada": "timedelta64[s]", "Tiempo fila": "int64", "Tiempo atención": "int64", "Hora salida": "timedelta64[s]", "Tamaño carrito": "int64"}),
+            "cashier_per_hour": RecordBuffer({"Iteración": "int64", "Cajero ID": "int64", "Hora inicio": "timedelta64[s]", "Hora fin": "timedelta64[s]",
+                                              "Tiempo promedio fila": "int64", "Desviación tiempo fila": "int64", "Tiempo fila p50": "int64", "Tiempo fila p90": "int64", "Tiempo fila p99": "int64",
+                                              "Longitud promedio fila": "int64", "Desviación longitud fila": "int64", "Longitud fila p50": "int64", "Longitud fila p90": "int64", "Longitud fila p99": "int64",
+                                              "Tiempo promedio atención": "int64", "Desviación tiempo atención": "int64", "Tiempo atención p50": "int64", "Tiempo atención p90": "int64", "Tiempo atención p99": "int64"})
+        }
+        self.statistics = {}    # DataFrames are created from the records when the simulation ends (or read from the files of a streaming exporter when they are requested).
 
     def define_parameters(self, simulation_parameters: dict):
         """
@@ -98,9 +154,11 @@ class Environment:
             simulation_parameters (dict): Dictionary containing the parameters listed below.
 
             Running parameters:
-                print_animation (bool): Allow to turn on/off printing in screen the animation. Turning this feature off (False) allows to run the simulation  faster. Turning it on limits the simulation to 1 frame per 0.005 seconds (200 FPS).
+                print_animation (bool): Allow to turn on/off printing in screen the animation. Turning this feature off (False) allows to run the simulation  faster. Turning it on limits the simulation to the speed given by time_scale.
         
-                time_scale (float): In seconds; simulation prints a frame each t seconds. Scale is t:1 second. This parameter is only valid if "print_animation" is True. If print_animation is False, the simulation will run at the lowest time possible.
+                time_scale (float): In seconds; each second of the simulation lasts t seconds of real time. Scale is t:1 second (e.g. 1/600 shows 600 simulated seconds per real second). This parameter is only valid if "print_animation" is True. If print_animation is False, the simulation will run at the lowest time possible.
+
+                frames_per_second (float): Frames printed per second of real time when print_animation is True. Frames are printed independently of the simulated seconds; if printing a frame takes longer, the next frames are skipped. Default is 30.
 
                 dynamic_arrival_time (bool): If True, a list containing the distribution of arrivals must be passed, if False, a fixed arrival time must be passed. This allows to add an arrival distribution similar to a real supermarket.
 
@@ -116,6 +174,32 @@ class Environment:
 
                 items_in_cart_distribution (str): "triangular" or "normal"
 
+                workers (int): Quantity of processes that run the iterations in parallel. If it is 1, iterations run one after another in this process. The animation can only be printed with 1 worker.
+
+                seed (int|None): Master seed. Each iteration receives an independent seed derived from it, so the same seed always produces the same statistics, with any quantity of workers. If None, a random seed is used.
+
+                check_invariants (bool): Debug mode. If True, after every second the running totals of each cashier's queue and the indexes of queues and customers are compared with a full recount, and an error is raised if they differ.
+
+                export_format (str|None): Format of the files where the statistics are saved: "csv", "parquet", "feather" or "excel". CSV, Parquet and Feather files are written in chunks while the simulation runs, so the rows saved are kept if the simulation stops; Excel files are written when the simulation ends. If None, no file is saved. Parquet and Feather require pyarrow.
+
+                export_chunk_size (int): Rows of a statistics table kept in memory before they are written in a file, when export_format is "csv", "parquet" or "feather".
+
+                profile (bool): If True, the real time and calls of each phase of the simulation loop (cashier schedule, cashiers, minute sample, arrivals, statistics, customer movement, queue switching, queue choice, render, invariants) and some counters (queue switch attempts, queue switches, record appends) are measured. They are printed when the simulation ends and can be obtained with profile_summary(). If False, the measurements are skipped.
+
+                checkpoint_interval (int|None): Seconds of the internal clock between two checkpoints of the same iteration, starting at the beginning of the iteration. A checkpoint is a compressed file with the complete state of the simulation (clock, cashiers and queues, customers, random numbers, pending arrivals and statistics not saved yet); load_checkpoint() and resume() continue the simulation from it. If None, checkpoints are only saved at checkpoint_times. Checkpoints are only saved with 1 worker.
+
+                checkpoint_times (list): Times of the internal clock (seconds of the day) when a checkpoint is saved, in every iteration.
+
+                checkpoint_file (str): Path of the checkpoint files; "{iteration}" and "{clock}" are replaced by the iteration number and the time of the internal clock.
+
+                result_cache (str|None): Folder where the statistics of finished simulations are saved, by a hash of the parameters that change them, the seed and the version of the simulator. If the same simulation is started again, its statistics are read from the folder instead of simulating (they are still saved with the exporter). Simulations without seed are not saved. If None, the cache is not used.
+
+                result_cache_size (int): Maximum size of the result_cache folder in bytes; the least recently used results are removed when it is bigger. Default is 1 GiB.
+
+                bypass_cache (bool): If True, the simulation is run even if its statistics are in result_cache, and the saved statistics are replaced.
+
+                engine (str): "clocked" evaluates every second of the simulation. "events" jumps the internal clock to the next event (arrival, service completion, cashier opening/closing or minute sample) when no agent is moving; recommended when print_animation is False.
+
             Fixed parameters:
                 arrival_time (int|list): If dynamic_arrival_time is True, a list containing the distribution of time must be provided; format is [[t1, arrival_time], [t2, arrival_time], …, [tn, arrival_time]]. If dynamic_arrival_time is False, an integer must be passed, and all the customers will arrive at the same average arrival time, using the distribution in arrival_time_distribution.
 
@@ -125,6 +209,8 @@ class Environment:
 
                 cashiers_y_axis (int): All cashiers will be generated at the same y axis.
 
+                layout (str|object|None): Path of a JSON file with the layout of the supermarket (see layout.StoreLayout.load()), or a StoreLayout. It defines the size of the supermarket, the lanes of the cashiers and the entrances, so the quantity of cashiers is not limited by the size of the terminal; width, height and cashiers_y_axis are replaced by the ones of the layout. If None, the supermarket has the size of the screen (30x30 without screen), one cashier every 3 columns and the entrance at the left end of the main queue.
+
             Variable parameters:
                 cashier_quantity (int|list): If dynamic_cashier_generation is True, a list containing the quantity of cashiers per hour must be provided; format is [[t1, n1], [t2, n2], …, [tn, n]]. If dynamic_cashier_generation is False, an integer must be passes and this fixed quantity of cashiers will be used from the beginning to the end of the simulation.
         """
@@ -133,249 +219,1045 @@ class Environment:
             if hasattr(self, key):
                 setattr(self, key, value)
 
+    def current_parameters(self):
+        """
+        Returns:
+            parameters (dict): Current value of each parameter in default_parameters, including the ones modified after define_parameters(), e.g. simulation.seed = 3.
+        """
+
+        return {key: getattr(self, key) for key in default_parameters}
+
     def start(self):
         """
         Start simulation. To finish the simulation press CTRL+C.
         This function only works with this specific simulation (supermarket queue).
+        If "workers" is greater than 1, the iterations are run in parallel processes; the statistics are the same ones obtained running them one after another with the same seed.
+        """
+
+        from numpy.random import SeedSequence   # Generates independent seeds for each iteration.
+        seed_sequences = SeedSequence(self.seed).spawn(self.iterations)   # Independent random numbers for each iteration.
+        self.seed_sequences = seed_sequences    # Kept in the checkpoints, so the next iterations can be run after resume().
+        self.interrupted = False
+        self.profiler = PhaseProfiler() if self.profile else None
+
+        if self.export_format is None:
+            self.exporter = None
+        elif self.export_format in exporters.formats:
+            self.exporter = exporters.formats[self.export_format](datetime.now().strftime('%Y-%m-%d-%H%M%S'))
+        else:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} export_format debe ser \"csv\", \"parquet\", \"feather\", \"excel\" o None.")
+
+        self.cache = None
+        self.cache_key = None
+        if self.result_cache is not None and self.seed is not None:    # Without seed, the statistics are different in every simulation.
+            self.cache = ResultCache(self.result_cache, self.result_cache_size)
+            self.cache_key = self.cache.key(self)
+            if not self.bypass_cache:
+                statistics = self.cache.load(self.cache_key, {k: record.columns for k, record in self.records.items()})
+                if statistics is not None:
+                    print(f"{colors.Bold.green}Estadísticas leídas de la caché \"{self.result_cache}\".{colors.Text.end}")
+                    self.finish_run(statistics)
+                    return
+
+        if self.workers > 1:
+            if self.print_animation:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La animación no se puede imprimir con más de un worker.")
+
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                replications = executor.map(run_replication, repeat(self.current_parameters()), repeat(self.width), repeat(self.height), range(self.iterations), seed_sequences)
+                for records, profiler in replications:   # Results are received in the same order as the iterations.
+                    for k, record in records.items():
+                        self.records[k].extend(record)
+                    if profiler is not None:
+                        self.profiler.merge(profiler)
+                    self.flush_records(force=True)
+        else:
+            for iteration in range(self.iterations):
+                self.run_iteration(iteration, seed_sequences[iteration])
+
+        self.finish_run()
+
+    def resume(self):
+        """
+        Continue a simulation loaded with load_checkpoint(): the iteration of the checkpoint is finished, the next iterations are run and the statistics are collected as in start().
+        Rows written in the files of the exporter after the checkpoint was saved are removed first, so they are not written twice.
+        """
+
+        if self.exporter is not None:
+            self.exporter.restore()
+
+        self.continue_iteration()
+        for iteration in range(self.i, self.iterations):
+            self.run_iteration(iteration, self.seed_sequences[iteration])
+
+        self.finish_run()
+
+    def finish_run(self, statistics = None):
+        """
+        Create the statistics tables when every iteration finished, save them with the exporter and in the result cache, and print the profile.
+        With a streaming exporter (CSV, Parquet or Feather), statistics is an ExportedTables: its tables are read from the files each time they are requested, so the memory used does not grow with the length of the simulation.
+
+        Args:
+            statistics (dict|None): Tables read from the result cache. If None, the tables are created from the records (or read from the files of the exporter).
+        """
+
+        if statistics is not None:
+            self.statistics = statistics
+            if self.exporter is not None:
+                for k, df in self.statistics.items():
+                    self.exporter.write(k, df)
+                self.exporter.close()
+        elif self.exporter is not None and self.exporter.streaming:
+            self.exporter.close()
+            self.statistics = exporters.ExportedTables(self.exporter, {k: record.columns for k, record in self.records.items()})   # The rows are in the files, not in the records; each table is read when it is requested.
+        else:
+            self.statistics = self.build_statistics()
+            if self.exporter is not None:
+                for k, df in self.statistics.items():
+                    self.exporter.write(k, df)
+                self.exporter.close()
+
+        if self.exporter is not None:
+            for file_name in self.exporter.files.values():
+                print(f"\"{file_name}\" saved.")
+
+        if statistics is None and self.cache is not None and not self.interrupted:
+            self.cache.store(self.cache_key, self.statistics, {k: record.columns for k, record in self.records.items()})
+
+        if self.profiler is not None:
+            self.profiler.print_summary()
+
+    def run_iteration(self, iteration: int, seed_sequence: object):
+        """
+        Run one iteration of the simulation and add its statistics to the records.
+
+        Args:
+            iteration (int): Iteration number, starting at 0.
+            seed_sequence (object): numpy.random.SeedSequence used to seed the random numbers of this iteration.
         """
 
-        for iteration in range(self.iterations):
-            self.clock = 0
+        self.setup_iteration(iteration, seed_sequence)
+        self.continue_iteration()
+
+    def build_store(self):
+        """
+        Create the layout of the supermarket from the parameter layout.
+
+        Returns:
+            store (object): StoreLayout of the parameter layout. If it is None, the original layout for the current width, height and cashiers_y_axis (see StoreLayout.from_size()).
+        """
+
+        if self.layout is None:
+            store = StoreLayout.from_size(self.width, self.height, self.cashiers_y_axis)
+        elif isinstance(self.layout, StoreLayout):
+            store = self.layout
+        else:
+            store = StoreLayout.load(self.layout)
+
+        if self.screen is not None and (store.width, store.height) != (self.screen.width, self.screen.height):
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} El tamaño de la pantalla ({self.screen.width}x{self.screen.height}) es distinto al del layout ({store.width}x{store.height}).")
+        return store
+
+    def setup_iteration(self, iteration: int, seed_sequence: object):
+        """
+        Prepare the supermarket for a new iteration: cashiers, arrival schedule, internal clock and event calendar.
+
+        Args:
+            iteration (int): Iteration number, starting at 0.
+            seed_sequence (object): numpy.random.SeedSequence used to seed the random numbers of this iteration.
+        """
+
+        self.store = self.build_store()
+        self.width = self.store.width
+        self.height = self.store.height
+        self.cashiers_y_axis = self.store.cashiers_y_axis
+        self.random = RandomStream(seed_sequence)
+        self.clock = 0
+        self.cashiers = []
+        self.inactive_cashiers = []
+        self.lane_x_locations = set()
+        self.open_queue_x_locations = []
+        self.open_queue_cashiers = {}
+        self.customer_count = 0
+        self.customers = CustomerRegistry()
+        self.waiting_times = StreamingStatistic()
+        self.second_counter = 0
+        self.i = iteration + 1
+        self.calendar = None
+        self.occupancy = bytearray(self.width * self.height)
+
+        match self.engine:
+            case "clocked":
+                pass
+            case "events":
+                self.calendar = EventCalendar()
+            case _:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} engine debe ser \"clocked\" o \"events\".")
+
+        if self.dynamic_arrival_time:
+            try:
+                self.statistics_periods = TimeBuckets(self.arrival_time)
+            except:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} arrival_time debe ser una lista conteniendo las distribuciones.")
+        else:
+            self.statistics_periods = TimeBuckets([[h * 3600, None] for h in range(0, 25)])    # One period per hour of the day.
+
+        if self.dynamic_cashier_generation:
+            functions.generate_cashiers(self, self.cashiers_y_axis, self.scanning_time, self.dynamic_scanning_time)
+            self.inactive_cashiers = self.cashiers.copy()
             self.cashiers = []
-            self.inactive_cashiers = []
-            self.customer_count = 0
-            self.customers = []
-            self.waiting_times = []
-            self.second_counter = 0
-            self.i = iteration + 1
+            self.lane_x_locations = set()
+            for cashier in self.inactive_cashiers:
+                functions.delete_cashier_queue(self, cashier)
+            
+            try:
+                self.cashier_schedule = [[t, n] for t, n in self.cashier_quantity]    # Copy, so the parameter is not modified between iterations.
+                for i in range(0, len(self.cashier_schedule)):
+                    if i + 1 < len(self.cashier_schedule):
+                        if self.cashier_schedule[i][1] - self.cashier_schedule[i + 1][1] > 0:
+                            self.cashier_schedule[i + 1][0] += 1800
+                        if self.cashier_schedule[i][1] > len(self.cashiers) + len(self.inactive_cashiers):
+                            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad máxima de cajeros es {colors.Regular.bold}{len(self.cashiers) + len(self.inactive_cashiers)}{colors.Text.end}.")
+                self.cashier_periods = TimeBuckets(self.cashier_schedule)
+            except:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} cashier_quantity debe ser una lista conteniendo la cantidad de cajeros por cuartil.")
+        else:
+            try:
+                functions.generate_cashiers_n(self, self.cashier_quantity, self.cashiers_y_axis, self.scanning_time, self.dynamic_scanning_time)
+            except:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} cashier_quantity debe ser integer.")
+            for cashier in self.cashiers:
+                cashier.status = "activating"   # Queues are opened in the first second, as with dynamic cashiers.
+
+        self.arrivals = []
+        self.arrival_index = 0
+        self.arrivals_closed = False
+        self.last_arrival = 0
+        if self.dynamic_arrival_time:
+            try:
+                self.clock = self.arrival_time[0][0]
+                self.last_arrival = self.clock
+            except:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} arrival_time debe ser una lista conteniendo las distribuciones.")
+        elif not isinstance(self.arrival_time, (int, float)):
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} arrival_time debe ser un integer.") 
 
+        self.next_arrival = self.next_arrival_time()
+
+        self.start_clock = self.clock
+        self.start_time = round(time())
+        self.end = False
+
+        if self.calendar is not None:
             if self.dynamic_cashier_generation:
-                functions.generate_cashiers(self, self.cashiers_y_axis, self.scanning_time, self.dynamic_scanning_time)
-                self.inactive_cashiers = self.cashiers.copy()
-                self.cashiers = []
-                for cashier in self.inactive_cashiers:
-                    functions.delete_cashier_queue(self.screen, cashier)
-                
-                try:
-                    for i in range(0, len(self.cashier_quantity)):
-                        if i + 1 < len(self.cashier_quantity):
-                            if self.cashier_quantity[i][1] - self.cashier_quantity[i + 1][1] > 0:
-                                self.cashier_quantity[i + 1][0] += 1800
-                            if self.cashier_quantity[i][1] > len(self.cashiers) + len(self.inactive_cashiers):
-                                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad máxima de cajeros es {colors.Regular.bold}{len(self.cashiers) + len(self.inactive_cashiers)}{colors.Text.end}.")
-                except:
-                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} cashier_quantity debe ser una lista conteniendo la cantidad de cajeros por cuartil.")
-            else:
-                try:
-                    functions.generate_cashiers_n(self, self.cashier_quantity, self.cashiers_y_axis, self.scanning_time, self.dynamic_scanning_time)
-                except:
-                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} cashier_quantity debe ser integer.")
-
-            match self.arrival_time_distribution:
-                case "exponential":
-                    arrival_distribution = np_random.exponential
-                case "poisson":
-                    arrival_distribution = np_random.poisson
-                case "":
-                    arrival_distribution = np_random.exponential
-                case _:
-                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Distribución estadística no compatible para arrival_time_distribution.")
-                
-            if self.dynamic_arrival_time:
-                try:
-                    self.clock = self.arrival_time[0][0]
-                    avg_arrival_time = self.arrival_time[0][1]
-                    next_arrival = self.clock + arrival_distribution(avg_arrival_time)
-                except:
-                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} arrival_time debe ser una lista conteniendo las distribuciones.")
+                for t, n in self.cashier_schedule:
+                    self.calendar.schedule(t, "cashier schedule")
+            if self.simulation_time != infinite:
+                self.calendar.schedule(ceil(self.simulation_time), "simulation time")
+            self.calendar.schedule(self.start_clock + 60, "minute sample")
+            if self.next_arrival != infinite:
+                self.calendar.schedule(floor(self.next_arrival) + 1, "arrival")
+
+        self.next_checkpoint = self.start_clock     # The first checkpoint is searched from the start of the iteration.
+        self.schedule_checkpoint()
+
+    def continue_iteration(self):
+        """
+        Run the simulation loop from the current state until the iteration ends, and add the statistics of the cashiers to the records.
+        It is used after setup_iteration() and to continue an iteration loaded from a checkpoint.
+        """
+
+        if self.print_animation:
+            if self.screen is None:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Se debe crear un Screen para imprimir la animación.")
+            functions.check_time_scale(self.time_scale)
+            self.screen.invalidate()    # Other text could have been printed since the last frame.
+            self.screen.print_screen()  #Initial screen printing.
+            self.pace_start = perf_counter()    # Real time when the first second of the simulation is shown.
+            self.pace_clock = self.clock        # Internal clock at pace_start; it is not start_clock when the iteration continues from a checkpoint.
+            self.next_frame = self.pace_start
+
+        try:
+            if self.calendar is None:
+                self.run_clocked()
             else:
-                try:
-                    avg_arrival_time = self.arrival_time
-                except:
-                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} arrival_time debe ser un integer.") 
+                self.run_event_driven()
+            if self.print_animation:
+                self.print_frame()  # Last state of the simulation.
+        
+            print(f"{colors.Bold.green}La simulación ha finalizado.{colors.Text.end}")
+            print(f"{colors.Regular.bold}Total de clientes:{colors.Text.end} {self.customer_count}")
+            print(f"{colors.Regular.bold}Hora de finalización:{colors.Text.end} {str(timedelta(seconds=round(self.clock)))}")
+            #print(f"{colors.Regular.bold}Tiempo medio de espera:{colors.Text.end} {str(timedelta(seconds=round(self.waiting_times.mean)))}")
+
+            if self.profiler is not None:
+                self.profiler.count("record appends", len(self.inactive_cashiers) * len(self.statistics_periods.starts))
+            for cashier in self.inactive_cashiers:
+                self.records["cashier_usage"].append((self.i, cashier.cashier_id, round(cashier.open_time), round(cashier.close_time), round(cashier.busy_time), cashier.customer_served))
                 
-                next_arrival = arrival_distribution(avg_arrival_time)
+                for t, t_end in zip(self.statistics_periods.starts[:-1], self.statistics_periods.starts[1:]):
+                    self.records["cashier_per_hour"].append((self.i, cashier.cashier_id, round(t), round(t_end)) + functions.rounded_summary(cashier.average_waiting_time.get(t)) + functions.rounded_summary(cashier.average_people_in_queue.get(t)) + functions.rounded_summary(cashier.average_attention_time.get(t)))
+
+        except KeyboardInterrupt:
+            self.interrupted = True
+            print(f"{colors.Bold.red}La simulación ha sido finalizada por el usuario.{colors.Text.end}")
+            print(f"{colors.Regular.bold}Total de clientes:{colors.Text.end} {self.customer_count}")
+            print(f"{colors.Regular.bold}Hora de finalización:{colors.Text.end} {str(timedelta(seconds=round(self.clock)))}")
+            print(f"{colors.Regular.bold}Tiempo medio de espera:{colors.Text.end} {str(timedelta(seconds=round(self.waiting_times.mean)))}")
+            if self.last_checkpoint is not None:
+                print(f"{colors.Regular.bold}Último checkpoint:{colors.Text.end} \"{self.last_checkpoint}\"")
+
+        self.flush_records(force=True)     # The rows of the finished iteration are saved.
+
+    def schedule_checkpoint(self):
+        """
+        Find the time of the next checkpoint after next_checkpoint (see checkpoint_interval and checkpoint_times). With the "events" engine, the time is added to the calendar, so the clock stops there.
+        """
+
+        times = [t for t in self.checkpoint_times if t > self.next_checkpoint]
+        if self.checkpoint_interval:
+            times.append(self.start_clock + (floor((self.next_checkpoint - self.start_clock) / self.checkpoint_interval) + 1) * self.checkpoint_interval)
+        self.next_checkpoint = min(times, default=infinite)
 
-            start_time = round(time())
+        if self.calendar is not None and self.next_checkpoint != infinite:
+            self.calendar.schedule(self.next_checkpoint, "checkpoint")
 
+    def save_checkpoint(self, path = None):
+        """
+        Save the complete state of the simulation in a compressed file (pickle). Before it is saved, the rows of the records are written with the exporter (if it writes in chunks), and the size of its files is kept, so resume() can remove the rows written after the checkpoint.
+
+        Args:
+            path (str|None): Path of the file. If None, checkpoint_file is used.
+
+        Returns:
+            path (str): Path of the file.
+        """
+
+        if self.clock >= self.next_checkpoint:
+            self.next_checkpoint = self.clock
+            self.schedule_checkpoint()  # The next checkpoint is found before saving, so the loaded simulation does not save this one again.
+        if path is None:
+            path = self.checkpoint_file.format(iteration=self.i, clock=round(self.clock))
+
+        self.flush_records(force=True)
+        if self.exporter is not None:
+            self.exporter.checkpoint()
+
+        with gzip.open(path, "wb", compresslevel=6) as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.last_checkpoint = path
+        return path
+
+    def reseed(self, seed_sequence: object):
+        """
+        Replace the random numbers of the current iteration, e.g. to obtain different replications from the same checkpoint. The arrivals that were not generated yet are drawn again with the new random numbers.
+
+        Args:
+            seed_sequence (object): numpy.random.SeedSequence (or integer seed).
+        """
+
+        self.random = RandomStream(seed_sequence)
+        if self.next_arrival == infinite:   # No more customers arrive.
+            return
+
+        if self.dynamic_arrival_time:
+            i = bisect_right(self.statistics_periods.starts, self.clock) - 1
+            arrival_time = [[self.clock, self.arrival_time[max(i, 0)][1]]] + [[t, mean_time] for t, mean_time in self.arrival_time if t > self.clock]
+            self.arrivals = functions.generate_arrival_schedule(arrival_time, self.arrival_time_distribution, self.random.generator, stop=self.simulation_time)[0].tolist()
+            self.arrivals_closed = True
+        else:
+            self.arrivals = []
+            self.arrivals_closed = False
+            self.last_arrival = self.clock
+        self.arrival_index = 0
+        self.next_arrival = self.next_arrival_time()
+
+        if self.calendar is not None and self.next_arrival != infinite:
+            self.calendar.schedule(floor(self.next_arrival) + 1, "arrival")
+
+    def profile_summary(self):
+        """
+        Measurements of the phases of the simulation loop (see the parameter profile).
+
+        Returns:
+            summary (dict|None): "phases" (seconds, calls and share of the total time of each phase) and "counters" (queue switch attempts, queue switches, record appends). None if profile is False.
+        """
+
+        if self.profiler is None:
+            return None
+        return self.profiler.summary()
+
+    def flush_records(self, force = False):
+        """
+        Write the rows of the records with the exporter and remove them from the records, if the exporter writes in chunks (see export_format). The space reserved by the records is kept, so the memory used does not grow with the simulation.
+
+        Args:
+            force (bool): If True, every row is written. If False, only the records with at least export_chunk_size rows are written.
+        """
+
+        if self.exporter is None or not self.exporter.streaming:
+            return
+
+        for k, record in self.records.items():
+            if len(record) > 0 and (force or len(record) >= self.export_chunk_size):
+                self.exporter.write(k, record.to_dataframe())
+                record.clear()
+
+    def build_statistics(self):
+        """
+        Create the statistics tables from the records collected in the simulation.
+
+        Returns:
+            statistics (dict): One DataFrame per record: "cashier_usage", "customers" and "cashier_per_hour".
+        """
+
+        return {k: record.to_dataframe() for k, record in self.records.items()}
+
+    def run_clocked(self):
+        """
+        Original engine: the internal clock advances 1 second per step and every agent is evaluated in every second.
+        """
+
+        while True:    # Loop: This simulation will run until user press ctrl+C.
+            if self.clock >= self.next_checkpoint:
+                self.save_checkpoint()
+            self.step()
             if self.print_animation:
-                if functions.check_time_scale(self.time_scale) < 0.002 :
-                        self.time_scale = 0.002
-                self.screen.print_screen()  #Initial screen printing.
-            else:
-                self.time_scale = 0
+                self.pace()
 
-            end = False
-            try:
-                while True:    # Loop: This simulation will run until user press ctrl+C.
-                    if end == False and self.dynamic_cashier_generation:
-                        try:
-                            for i in range(0, len(self.cashier_quantity)):
-                                if self.clock >= self.cashier_quantity[i][0] and self.clock < self.cashier_quantity[i + 1][0]:
-                                    if len(self.cashiers) == 0:
-                                        for j in range(0, self.cashier_quantity[i][1]):
-                                            self.inactive_cashiers[0].status = "activating"
-                                            self.cashiers.append(self.inactive_cashiers[0])
-                                            self.inactive_cashiers.remove(self.inactive_cashiers[0])
-                                    elif self.cashier_quantity[i][1] - len(self.cashiers) < 0:
-                                        for j in range(1, abs(self.cashier_quantity[i][1] - len(self.cashiers)) + 1):
-                                            self.cashiers[-j].open_queue = False
-                                    elif self.cashier_quantity[i][1] - len(self.cashiers) > 0:
-                                        for j in range(0, self.cashier_quantity[i][1] - len(self.cashiers)):
-                                            self.inactive_cashiers[0].status = "activating"
-                                            self.cashiers.append(self.inactive_cashiers[0])
-                                            self.inactive_cashiers.remove(self.inactive_cashiers[0])
-                        except:
-                            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Se debe proporcionar la cantidad de cajeros por cuartiles en una lista en cashier_quantity.")
-                    
-                    for cashier in self.cashiers:  # Evaluates the status for each cashier in the simulation an execute a method or action according their status.
-                        match cashier.status:
-                            case "activating" :
-                                cashier.spawn()
-                                functions.generate_cashier_queue(self.screen, cashier)
-                                cashier.status = "available"
-                                cashier.open_queue = True
-                                cashier.open_time = self.clock
-                            case "busy":   # If the cashier is busy (serving a customer), check if simulation's internal clock is equal to the time they finish attending the customer. If the times are the same, release the customer.
-                                if self.clock > cashier.current_customer_complete_time:
-                                    cashier.release_customer()
-                            case "available":  # If the cashier is available and there is someone in their queue, call them.
-                                if (len(cashier.customer_queue) == 0 and cashier.open_queue == False) or (len(cashier.customer_queue) == 0 and end):
-                                    functions.delete_cashier_queue(self.screen, cashier)
-                                    cashier.disappear()
-                                    self.inactive_cashiers.append(cashier)
-                                    self.cashiers.remove(cashier)
-                                    cashier.close_time = self.clock
-                                else:
-                                    cashier.call_customer()
-                                    if isinstance(cashier.current_customer,Customer):
-                                        for i in range(0, len(self.arrival_time)):
-                                            if self.clock >= self.arrival_time[i][0] and self.clock < self.arrival_time[i+1][0]:
-                                                key = self.arrival_time[i][0]
-                                                if key in cashier.average_attention_time:
-                                                    cashier.average_attention_time[key].append(cashier.current_customer_complete_time - self.clock)
-                    
-                    if self.second_counter >= 60:
-                        for i in range(0, len(self.arrival_time)):
-                            if self.clock >= self.arrival_time[i][0] and self.clock < self.arrival_time[i+1][0]:
-                                key = self.arrival_time[i][0]
-                                for cashier in self.cashiers:
-                                    waiting_time = []
-                                    for customer in cashier.customer_queue:
-                                        waiting_time.append(self.clock - customer.queue_arrival_time)
-
-                                    if key in cashier.average_waiting_time:
-                                        if len(waiting_time) > 0:
-                                            cashier.average_waiting_time[key].append(mean(waiting_time))
-                                        if len(cashier.customer_queue) > 0:
-                                            cashier.average_people_in_queue[key].append(len(cashier.customer_queue))
-
-                    if self.customer_count < self.customer_quantity and self.clock < self.simulation_time:
-                        if end == False and self.clock > next_arrival:
-                            if self.dynamic_arrival_time:
-                    
-                                for i in range(0, len(self.arrival_time)):
-                                    if self.clock >= self.arrival_time[i][0] and self.clock < self.arrival_time[i+1][0]:
-                                        avg_arrival_time = self.arrival_time[i][1]
-
-                                        if avg_arrival_time == 0:
-                                            end = True
-
-                            customer = Customer(self, functions.random_customer_kind(self.observer_customer_probability), minimum_cart_items=self.minimum_cart_items, maximum_cart_items=self.maximum_cart_items)  # Create a customer; "observer" customer is generated with a probability of 3%.
-                            customer.customer_id = self.customer_count + 1
-                            customer.spawn(0,28)    # Spawn point set in (0,28).
-                            customer.arrival_time = self.clock
-                            self.customer_count += 1
-                            next_arrival += arrival_distribution(avg_arrival_time)
+            if self.end and len(self.customers) == 0:
+                break
+            
+            if self.second_counter >= 60:
+                self.second_counter = 0
+            self.clock += 1
+            self.second_counter += 1   # Increase 1 second the internal clock.
+
+    def run_event_driven(self):
+        """
+        Discrete-event engine: seconds are evaluated one by one only while some agent is moving or changing its status. When a second ends without changes, nothing else can happen until the next event in the calendar (arrival, service completion, cashier opening/closing, minute sample or end of the simulation time), so the clock jumps straight to it.
+        The statistics obtained are the same ones obtained with run_clocked() for the same random numbers.
+        """
+
+        while True:
+            if self.clock >= self.next_checkpoint:
+                self.save_checkpoint()
+            changed = self.step()
+            if self.print_animation:
+                self.pace()
+
+            if self.end and len(self.customers) == 0:
+                break
+
+            next_clock = self.clock + 1
+            if not changed:
+                next_event = self.calendar.next_time(self.clock)
+                if next_event is not None:
+                    next_clock = next_event
+
+            self.clock = next_clock
+            self.second_counter = (self.clock - self.start_clock - 1) % 60 + 1    # Same value run_clocked() would have after counting the skipped seconds.
+
+    def step(self):
+        """
+        Evaluate every cashier and customer once, in the current second of the internal clock.
+
+        Returns:
+            changed (bool): True if some agent moved or changed its status. If False, the next seconds will not have changes until the next event in the calendar.
+        """
+
+        changed = False
+        profiler = self.profiler
+        if profiler is not None:
+            t = perf_counter()
+
+        if self.end == False and self.dynamic_cashier_generation:
+            i = self.cashier_periods.find(self.clock)
+            if i is not None:
+                cashier_quantity = self.cashier_periods.values[i]
+                if len(self.cashiers) == 0:
+                    for j in range(0, cashier_quantity):
+                        self.inactive_cashiers[0].status = "activating"
+                        self.activate_cashier(self.inactive_cashiers[0])
+                        self.inactive_cashiers.remove(self.inactive_cashiers[0])
+                        changed = True
+                elif cashier_quantity - len(self.cashiers) < 0:
+                    for j in range(1, abs(cashier_quantity - len(self.cashiers)) + 1):
+                        if self.cashiers[-j].open_queue:
+                            self.set_queue_open(self.cashiers[-j], False)
+                            changed = True
+                elif cashier_quantity - len(self.cashiers) > 0:
+                    for j in range(0, cashier_quantity - len(self.cashiers)):
+                        self.inactive_cashiers[0].status = "activating"
+                        self.activate_cashier(self.inactive_cashiers[0])
+                        self.inactive_cashiers.remove(self.inactive_cashiers[0])
+                        changed = True
+
+        if profiler is not None:
+            t = profiler.lap("cashier schedule", t)
+        
+        for cashier in self.cashiers:  # Evaluates the status for each cashier in the simulation an execute a method or action according their status.
+            match cashier.status:
+                case "activating" :
+                    cashier.spawn()
+                    functions.generate_cashier_queue(self, cashier)
+                    cashier.status = "available"
+                    self.set_queue_open(cashier, True)
+                    cashier.open_time = self.clock
+                    changed = True
+                case "busy":   # If the cashier is busy (serving a customer), check if simulation's internal clock is equal to the time they finish attending the customer. If the times are the same, release the customer.
+                    if self.clock > cashier.current_customer_complete_time:
+                        cashier.release_customer()
+                        changed = True
+                case "available":  # If the cashier is available and there is someone in their queue, call them.
+                    if (len(cashier.customer_queue) == 0 and cashier.open_queue == False) or (len(cashier.customer_queue) == 0 and self.end):
+                        functions.delete_cashier_queue(self, cashier)
+                        cashier.disappear()
+                        self.inactive_cashiers.append(cashier)
+                        self.deactivate_cashier(cashier)
+                        cashier.close_time = self.clock
+                        changed = True
                     else:
-                        end = True
-                        
-                    if len(self.customers) > 0:
-                        for customer in self.customers:    # Evaluates the status for each customer in the simulation an execute a method or action according their status.
-                            match customer.status:
-                                case "exiting":
-                                    customer.exit_store_clocked()
-                                case "spawned":
-                                    customer.choose_queue()
-                                case "moving to queue":
-                                    customer.move_to_queue_clocked()
-                                case "in queue":
-                                    customer.move_in_queue_clocked()
-                                    if customer == customer.chosen_cashier.customer_queue[-1] and customer.chosen_cashier.customer_queue.index(customer) != 0:
-                                        customer.search_different_queue()
-                                case "changing queue":
-                                    customer.change_queue_clocked()
-                                case "finished":
-                                    customer.exit_time = self.clock
-                                    self.statistics["customers"].loc[len(self.statistics["customers"])] = [self.i, customer.customer_id, str(timedelta(seconds=round(customer.arrival_time))), customer.paying_arrival_time - customer.queue_arrival_time, customer.attention_time_span, str(timedelta(seconds=round(self.clock))), customer.cart_size]
-                                    self.customers.remove(customer)
-
-                    if self.print_animation:
-                        self.screen.print_screen()
-
-                        print(f"{colors.Regular.bold}Tiempo:{colors.Text.end} {str(timedelta(seconds=round(self.clock)))}                        {colors.Regular.bold}Tiempo real:{colors.Text.end} {str(timedelta(seconds=round(time())-start_time))}")
-
-                        """print(f"{colors.Regular.bold}Siguiente llegada:{colors.Text.end} {str(timedelta(seconds=round(next_arrival)))}")
-
-                        if len(self.waiting_times) > 0:
-                            print(f"{colors.Regular.bold}Promedio de espera:{colors.Text.end} {str(timedelta(seconds=round(mean(self.waiting_times))))}")"""
-
-                        print(f"\n{colors.Regular.bold}Estatus{colors.Text.end}")
-                        print(f"{colors.Regular.bold}Total clientes:{colors.Text.end} {self.customer_count}     {colors.Regular.bold}Atendidos:{colors.Text.end} {self.customer_count - len(self.customers)}     {colors.Regular.bold}En sistema:{colors.Text.end} {len(self.customers)}\n")
-                        for cashier in self.cashiers:
-                            if cashier.current_customer != None:
-                                print(f"{colors.Regular.bold}Cajero {cashier.cashier_id} ({colors.Text.end}{colors.Bold.red}Ocupado{colors.Text.end}{colors.Regular.bold}):{colors.Text.end} Atendiendo a Cliente {cashier.current_customer.customer_id} ({cashier.current_customer.cart_size} artículos)")
-                            else:
-                                print(f"{colors.Regular.bold}Cashier {cashier.cashier_id} ({colors.Text.end}{colors.Bold.green}Disponible{colors.Text.end}{colors.Regular.bold}){colors.Text.end}")
-                            #if cashier.current_customer_complete_time < self.clock and cashier.current_customer != None:
-                            #    print(f"{colors.Bold.red}Error:{colors.Text.end} Cajero {cashier.cashier_id} atascado.")
-
-                        if end:
-                            print(f"{colors.Bold.red}Tienda cerrada:{colors.Text.end} Ya no se aceptan más clientes.")
-
-                    if self.time_scale > 0:
-                        sleep(1 * self.time_scale)  # Wait 0.1 second * scale before continue. 
-
-                    if end and len(self.customers) == 0:
-                        break
-                    
-                    if self.second_counter >= 60:
-                        self.second_counter = 0
-                    self.clock += 1
-                    self.second_counter += 1   # Increase 1 second the internal clock.
+                        cashier.call_customer()
+                        if isinstance(cashier.current_customer,Customer):
+                            changed = True
+                            self.schedule_event(floor(cashier.current_customer_complete_time) + 1, "service completion")
+                            i = self.statistics_periods.find(self.clock)
+                            if i is not None:
+                                cashier.average_attention_time[self.statistics_periods.starts[i]].add(cashier.current_customer_complete_time - self.clock)
+
+        if profiler is not None:
+            t = profiler.lap("cashiers", t)
+        
+        if self.second_counter >= 60:
+            self.schedule_event(self.clock + 60, "minute sample")
+            i = self.statistics_periods.find(self.clock)
+            if i is not None:
+                key = self.statistics_periods.starts[i]
+                for cashier in self.cashiers:
+                    waiting_time = []
+                    for customer in cashier.customer_queue:
+                        waiting_time.append(self.clock - customer.queue_arrival_time)
+
+                    if len(waiting_time) > 0:
+                        cashier.average_waiting_time[key].add(sum(waiting_time) / len(waiting_time))
+                    if len(cashier.customer_queue) > 0:
+                        cashier.average_people_in_queue[key].add(len(cashier.customer_queue))
+
+            if profiler is not None:
+                t = profiler.lap("minute sample", t)
+
+        if self.customer_count < self.customer_quantity and self.clock < self.simulation_time and self.next_arrival != infinite:
+            if self.end == False and self.clock > self.next_arrival:
+                customer = self.new_customer(functions.random_customer_kind(self.observer_customer_probability, self.random))  # Create a customer; "observer" customer is generated with a probability of 3%.
+                customer.customer_id = self.customer_count + 1
+                self.customers.add(customer)
+                entrances = self.store.entrances
+                entrance = entrances[0] if len(entrances) == 1 else entrances[floor(self.random.uniform() * len(entrances))]    # With one entrance, no random number is used.
+                customer.spawn(entrance, self.store.main_row)
+                customer.arrival_time = self.clock
+                self.customer_count += 1
+                self.next_arrival = self.next_arrival_time()
+                if self.next_arrival != infinite:
+                    self.schedule_event(floor(self.next_arrival) + 1, "arrival")
+                changed = True
+        elif self.end == False:
+            self.end = True
+            changed = True
+
+        if profiler is not None:
+            t = profiler.lap("arrivals", t)
             
-                print(f"{colors.Bold.green}La simulación ha finalizado.{colors.Text.end}")
-                print(f"{colors.Regular.bold}Total de clientes:{colors.Text.end} {self.customer_count}")
-                print(f"{colors.Regular.bold}Hora de finalización:{colors.Text.end} {str(timedelta(seconds=round(self.clock)))}")
-                #print(f"{colors.Regular.bold}Tiempo medio de espera:{colors.Text.end} {str(timedelta(seconds=round(mean(self.waiting_times))))}")
-
-                for cashier in self.inactive_cashiers:
-                    self.statistics["cashier_usage"].loc[len(self.statistics["cashier_usage"])] = [self.i, cashier.cashier_id, str(timedelta(seconds=round(cashier.open_time))), str(timedelta(seconds=round(cashier.close_time))), cashier.busy_time, cashier.customer_served]
-                    
-                    for t, v in cashier.average_waiting_time.items():
-                        self.statistics["cashier_per_hour"].loc[len(self.statistics["cashier_per_hour"])] = [self.i, cashier.cashier_id, str(timedelta(seconds=round(t))), str(timedelta(seconds=round(t + 3600))), functions.safe_rounded_mean(cashier.average_waiting_time[t]), functions.safe_rounded_mean(cashier.average_people_in_queue[t]), functions.safe_rounded_mean(cashier.average_attention_time[t])]
-
-            except KeyboardInterrupt:
-                print(f"{colors.Bold.red}La simulación ha sido finalizada por el usuario.{colors.Text.end}")
-                print(f"{colors.Regular.bold}Total de clientes:{colors.Text.end} {self.customer_count}")
-                print(f"{colors.Regular.bold}Hora de finalización:{colors.Text.end} {str(timedelta(seconds=round(self.clock)))}")
-                print(f"{colors.Regular.bold}Tiempo medio de espera:{colors.Text.end} {str(timedelta(seconds=round(mean(self.waiting_times))))}")
-
-        for k, df in self.statistics.items():
-                    file_name = f"{k}-{datetime.now().strftime('%Y-%m-%d-%H%M%S')}.xlsx"
-                    df.to_excel(file_name)
-                    print(f"\"{file_name}\" saved.")
+        if len(self.customers) > 0:
+            # Each phase only evaluates the customers with its status. The customers of every phase are taken before any of them acts, so a customer acts only once per second. Phases go from the exit to the entrance, so the customers in front move first.
+            finished, exiting, changing_queue, in_queue, moving_to_queue, spawned = [self.customers.with_status(status) for status in ("finished", "exiting", "changing queue", "in queue", "moving to queue", "spawned")]
+
+            for customer in finished:
+                customer.exit_time = self.clock
+                self.records["customers"].append((self.i, customer.customer_id, round(customer.arrival_time), round(customer.paying_arrival_time - customer.queue_arrival_time), round(customer.attention_time_span), round(self.clock), customer.cart_size))
+                self.customers.remove(customer)
+                self.customer_pool.append(customer)     # The customer can be used again for a new arrival.
+                changed = True
+
+            if finished:
+                self.flush_records()
+                if profiler is not None:
+                    profiler.count("record appends", len(finished))
+                    t = profiler.lap("statistics", t)
+
+            for customer in exiting:
+                customer.exit_store_clocked()
+                changed = True
+
+            for customer in changing_queue:
+                x_location, y_location = customer.x_location, customer.y_location
+                customer.change_queue_clocked()
+                if customer.x_location != x_location or customer.y_location != y_location or customer.status != "changing queue":
+                    changed = True
+
+            for customer in in_queue:
+                y_location = customer.y_location
+                customer.move_in_queue_clocked()
+                if customer.y_location != y_location or customer.status != "in queue":
+                    changed = True
+
+            for customer in moving_to_queue:
+                customer.move_to_queue_clocked()
+                changed = True
+
+            if profiler is not None:
+                t = profiler.lap("customer movement", t)
+
+            for customer in in_queue:   # Moving in a queue does not change the queues, so the last customers search a different queue after every customer moved.
+                queue = customer.chosen_cashier.customer_queue
+                if customer is queue[-1] and len(queue) > 1:    # Last customer of the queue, and not the only one.
+                    customer.search_different_queue()
+                    if customer.status == "changing queue":
+                        changed = True
+
+            if profiler is not None:
+                t = profiler.lap("queue switching", t)
+
+            for customer in spawned:
+                customer.choose_queue()
+                changed = True
+
+            if profiler is not None:
+                t = profiler.lap("queue choice", t)
+
+        if self.check_invariants:
+            self.verify_invariants()
+            if profiler is not None:
+                t = profiler.lap("invariants", t)
+
+        return changed
+
+    def pace(self):
+        """
+        Keep the animation at the speed given by time_scale and print frames at frames_per_second, independently of the quantity of simulated seconds.
+        Called after each step: waits until the current second of the simulation is due in real time, printing the frames that are due meanwhile. If the simulation or the printing falls behind, it does not wait and the frames that are late are skipped.
+        """
+
+        due = self.pace_start + (self.clock - self.pace_clock) * self.time_scale
+        frame_interval = 1 / self.frames_per_second
+
+        while True:
+            now = perf_counter()
+            if now >= self.next_frame:
+                self.print_frame()
+                if self.profiler is not None:
+                    self.profiler.lap("render", now)
+                self.next_frame += frame_interval
+                if self.next_frame < now:   # Printing is behind: skip the late frames.
+                    self.next_frame = now + frame_interval
+            if now >= due:
+                break
+            sleep(max(0, min(due, self.next_frame) - now))
+
+    def print_frame(self):
+        """
+        Print the screen and the status of the simulation.
+        """
+
+        status_lines = [f"{colors.Regular.bold}Tiempo:{colors.Text.end} {str(timedelta(seconds=round(self.clock)))}                        {colors.Regular.bold}Tiempo real:{colors.Text.end} {str(timedelta(seconds=round(time())-self.start_time))}"]
+
+        """status_lines.append(f"{colors.Regular.bold}Siguiente llegada:{colors.Text.end} {str(timedelta(seconds=round(self.next_arrival)))}")
+
+        if self.waiting_times.count > 0:
+            status_lines.append(f"{colors.Regular.bold}Promedio de espera:{colors.Text.end} {str(timedelta(seconds=round(self.waiting_times.mean)))}")"""
+
+        status_lines.append("")
+        status_lines.append(f"{colors.Regular.bold}Estatus{colors.Text.end}")
+        status_lines.append(f"{colors.Regular.bold}Total clientes:{colors.Text.end} {self.customer_count}     {colors.Regular.bold}Atendidos:{colors.Text.end} {self.customer_count - len(self.customers)}     {colors.Regular.bold}En sistema:{colors.Text.end} {len(self.customers)}")
+        status_lines.append("")
+        for cashier in self.cashiers:
+            if cashier.current_customer != None:
+                status_lines.append(f"{colors.Regular.bold}Cajero {cashier.cashier_id} ({colors.Text.end}{colors.Bold.red}Ocupado{colors.Text.end}{colors.Regular.bold}):{colors.Text.end} Atendiendo a Cliente {cashier.current_customer.customer_id} ({cashier.current_customer.cart_size} artículos)")
+            else:
+                status_lines.append(f"{colors.Regular.bold}Cashier {cashier.cashier_id} ({colors.Text.end}{colors.Bold.green}Disponible{colors.Text.end}{colors.Regular.bold}){colors.Text.end}")
+            #if cashier.current_customer_complete_time < self.clock and cashier.current_customer != None:
+            #    print(f"{colors.Bold.red}Error:{colors.Text.end} Cajero {cashier.cashier_id} atascado.")
+
+        if self.end:
+            status_lines.append(f"{colors.Bold.red}Tienda cerrada:{colors.Text.end} Ya no se aceptan más clientes.")
+
+        self.screen.print_screen(status_lines)
+
+    def activate_cashier(self, cashier: object):
+        """
+        Add a cashier to the list of cashiers in the simulation.
+
+        Args:
+            cashier (object): Cashier to add.
+        """
+
+        self.cashiers.append(cashier)
+        self.lane_x_locations.add(cashier.x_location + 1)
+
+    def deactivate_cashier(self, cashier: object):
+        """
+        Remove a cashier from the list of cashiers in the simulation and close their queue.
+
+        Args:
+            cashier (object): Cashier to remove.
+        """
+
+        self.cashiers.remove(cashier)
+        self.lane_x_locations.discard(cashier.x_location + 1)
+        self.set_queue_open(cashier, False)
+
+    def set_queue_open(self, cashier: object, open_queue: bool):
+        """
+        Open or close the queue of a cashier and update the index of open queues.
+
+        Args:
+            cashier (object): Cashier whose queue is opened or closed.
+            open_queue (bool): True to open the queue, False to close it.
+        """
+
+        if open_queue and cashier.x_location not in self.open_queue_cashiers:
+            insort(self.open_queue_x_locations, cashier.x_location)
+            self.open_queue_cashiers[cashier.x_location] = cashier
+        elif not open_queue and self.open_queue_cashiers.get(cashier.x_location) is cashier:
+            del self.open_queue_x_locations[bisect_left(self.open_queue_x_locations, cashier.x_location)]
+            del self.open_queue_cashiers[cashier.x_location]
+
+        cashier.open_queue = open_queue
+
+    def neighbor_queues(self, cashier: object):
+        """
+        Find the nearest open queues at the left and at the right of a cashier.
+
+        Args:
+            cashier (object): Cashier in the middle.
+
+        Returns:
+            cashiers (list): [left cashier, right cashier]. If there is no open queue at one side, the given cashier is returned for that side.
+        """
+
+        left_cashier = cashier
+        right_cashier = cashier
+
+        i = bisect_left(self.open_queue_x_locations, cashier.x_location)
+        if i > 0:
+            left_cashier = self.open_queue_cashiers[self.open_queue_x_locations[i - 1]]
+
+        i = bisect_right(self.open_queue_x_locations, cashier.x_location)
+        if i < len(self.open_queue_x_locations):
+            right_cashier = self.open_queue_cashiers[self.open_queue_x_locations[i]]
+
+        return [left_cashier, right_cashier]
+
+    def verify_invariants(self):
+        """
+        Debug mode: recount the items of every queue and compare them with the running totals kept by the cashiers, and check the indexes of queues and customers. Raises an error if they differ.
+        """
+
+        for cashier in self.cashiers + self.inactive_cashiers:
+            queue_items = sum(customer.cart_size for customer in cashier.customer_queue)
+            if queue_items != cashier.queue_items:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Cajero {cashier.cashier_id} tiene {cashier.queue_items} artículos en fila, pero el recuento es {queue_items} (tiempo {self.clock}).")
+
+        if self.open_queue_x_locations != sorted(cashier.x_location for cashier in self.cashiers if cashier.open_queue):
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} El índice de filas abiertas no coincide con los cajeros (tiempo {self.clock}).")
+        if self.lane_x_locations != {cashier.x_location + 1 for cashier in self.cashiers}:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} El conjunto de filas no coincide con los cajeros (tiempo {self.clock}).")
+
+        for status, bucket in self.customers.buckets.items():
+            for customer in bucket.values():
+                if customer.status != status or self.customers.by_id.get(customer.customer_id) is not customer:
+                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Cliente {customer.customer_id} está en el grupo \"{status}\" pero su estatus es \"{customer.status}\" (tiempo {self.clock}).")
+        if sum(len(bucket) for bucket in self.customers.buckets.values()) != len(self.customers):
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Los grupos de clientes no coinciden con el registro (tiempo {self.clock}).")
+
+    def next_arrival_time(self):
+        """
+        Take the time of the next arrival from the arrival schedule. The schedule of the whole day is generated at once with functions.generate_arrival_schedule(); if arrival_time is fixed and there is no simulation_time, it is generated in blocks of 1024 arrivals.
+
+        Returns:
+            next_arrival (float): Time of the next arrival. It is infinite when no more customers arrive (the store closed).
+        """
+
+        if self.arrival_index == len(self.arrivals) and not self.arrivals_closed:
+            if self.dynamic_arrival_time:
+                arrival_time = self.arrival_time
+                stop = self.simulation_time
+            else:
+                arrival_time = [[self.last_arrival, self.arrival_time]]
+                stop = min(self.last_arrival + 1024 * self.arrival_time, self.simulation_time)
+
+            self.arrivals = functions.generate_arrival_schedule(arrival_time, self.arrival_time_distribution, self.random.generator, stop=stop)[0].tolist()
+            self.arrival_index = 0
+            self.arrivals_closed = self.dynamic_arrival_time or stop >= self.simulation_time or self.arrival_time == 0
+
+        if self.arrival_index < len(self.arrivals):
+            self.last_arrival = self.arrivals[self.arrival_index]
+            self.arrival_index += 1
+            return self.last_arrival
+        else:
+            return infinite
+
+    def schedule_event(self, event_time: int, kind: str):
+        """
+        Add an event to the calendar. It does nothing if the engine is "clocked", because it evaluates every second.
+
+        Args:
+            event_time (int): Second of the internal clock where the event happens.
+            kind (str): Description of the event.
+        """
+
+        if self.calendar is not None:
+            self.calendar.schedule(event_time, kind)
+
+    def occupy(self, x_location: int, y_location: int):
+        """
+        Mark a tile as occupied by a customer.
+
+        Args:
+            x_location (int): Tile location in the x axis.
+            y_location (int): Tile location in the y axis.
+        """
+
+        self.occupancy[y_location * self.width + x_location] = 1
+
+    def vacate(self, x_location: int, y_location: int):
+        """
+        Mark a tile as free.
+
+        Args:
+            x_location (int): Tile location in the x axis.
+            y_location (int): Tile location in the y axis.
+        """
+
+        self.occupancy[y_location * self.width + x_location] = 0
+
+    def is_occupied(self, x_location: int, y_location: int):
+        """
+        Args:
+            x_location (int): Tile location in the x axis.
+            y_location (int): Tile location in the y axis.
+
+        Returns:
+            occupied (bool): True if a customer is standing in the tile.
+        """
+
+        return self.occupancy[y_location * self.width + x_location] == 1
+
+    def occupancy_grid(self):
+        """
+        Returns:
+            grid (object): Boolean numpy array (height, width) that shares its memory with occupancy, e.g. to count the customers in an area.
+        """
+
+        import numpy as np
+        return np.frombuffer(self.occupancy, dtype=bool).reshape(self.height, self.width)
+
+    def new_customer(self, customer_kind: str):
+        """
+        Take a customer from customer_pool and set it as a new customer; if the pool is empty, a new Customer is created.
+
+        Args:
+            customer_kind (str): "regular" or "observer".
+
+        Returns:
+            customer (object): Customer with status "spawned". Its customer ID must be assigned before adding it to customers.
+        """
+
+        if self.customer_pool:
+            customer = self.customer_pool.pop()
+            customer.reset(customer_kind, self.minimum_cart_items, self.maximum_cart_items)
+            return customer
+
+        return Customer(self, customer_kind, minimum_cart_items=self.minimum_cart_items, maximum_cart_items=self.maximum_cart_items)
+
+    def clear_tile(self, x_location: int, y_location: int, element: object):
+        """
+        Remove the customer standing in a tile. If the environment has a screen, the tile is drawn again with the given element.
+
+        Args:
+            x_location (int): Tile location in the x axis.
+            y_location (int): Tile location in the y axis.
+            element (object): Shared element from the module "elements" (elements.queue or elements.void) that is drawn in the tile.
+        """
+
+        self.occupancy[y_location * self.width + x_location] = 0
+        if self.screen is not None:
+            self.screen.set_tile(x_location, y_location, element.sprite)
+
+class TimeBuckets:
+    """
+    Index of the periods of a schedule, e.g. arrival_time or cashier_quantity. Period i starts at t_i and ends at t_(i+1); the last time of the schedule only marks the end of the previous period.
+    The last period found is kept, so finding the period of the internal clock (which only moves forward) takes constant time; if the time is outside that period, it is searched with bisect.
+
+    Args:
+        schedule (list): Format is [[t1, value], [t2, value], …, [tn, value]], sorted by time.
+
+    Attributes:
+        starts (list): Start time of each period.
+        values (list): Value of each period.
+    """
+
+    def __init__(self, schedule: list):
+        self.starts = [t for t, value in schedule]
+        self.values = [value for t, value in schedule]
+        self.index = None
+        self.start = infinite
+        self.end = -infinite
+
+    def find(self, time: float):
+        """
+        Find the period that contains the time.
+
+        Args:
+            time (float): Time in seconds.
+
+        Returns:
+            i (int|None): Index of the period. None if the time is before the first period or after the last one.
+        """
+
+        if self.start <= time < self.end:
+            return self.index
+
+        i = bisect_right(self.starts, time) - 1
+        if i < 0 or i >= len(self.starts) - 1:
+            return None
+
+        self.index = i
+        self.start = self.starts[i]
+        self.end = self.starts[i + 1]
+        return i
+
+class CustomerRegistry:
+    """
+    Customers in the simulation, by customer ID and by status. Adding, removing and changing the status of a customer takes constant time.
+    Customer.status updates the registry automatically, so a status only has to be assigned as usual.
+
+    Attributes:
+        by_id (dict): Customers by customer ID.
+        buckets (dict): One dictionary of customers (by customer ID) per status, in the order they got that status.
+    """
+
+    statuses = ("spawned", "moving to queue", "in queue", "changing queue", "ready", "paying", "exiting", "finished")
+
+    def __init__(self):
+        self.by_id = {}
+        self.buckets = {status: {} for status in self.statuses}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def add(self, customer: object):
+        """
+        Add a customer. Its customer ID must be assigned before.
+
+        Args:
+            customer (object): Customer to add.
+        """
+
+        if customer.customer_id in self.by_id:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} El cliente {customer.customer_id} ya está registrado.")
+
+        self.by_id[customer.customer_id] = customer
+        self.buckets[customer.status][customer.customer_id] = customer
+
+    def remove(self, customer: object):
+        """
+        Remove a customer.
+
+        Args:
+            customer (object): Customer to remove.
+        """
+
+        del self.by_id[customer.customer_id]
+        del self.buckets[customer.status][customer.customer_id]
+
+    def move(self, customer: object, old_status: str, new_status: str):
+        """
+        Move a customer to the group of its new status. Customers that are not in the registry are ignored.
+
+        Args:
+            customer (object): Customer that changed status.
+            old_status (str): Previous status.
+            new_status (str): New status.
+        """
+
+        if self.by_id.get(customer.customer_id) is customer:
+            del self.buckets[old_status][customer.customer_id]
+            self.buckets[new_status][customer.customer_id] = customer
+
+    def with_status(self, status: str):
+        """
+        Args:
+            status (str): Status of the customers.
+
+        Returns:
+            customers (list): Customers with the status, in the order they got it.
+        """
+
+        return list(self.buckets[status].values())
+
+class EventCalendar:
+    """
+    Heap-ordered calendar of the seconds where the simulation can change without any agent moving: arrivals, service completions, cashier openings/closings, minute samples and the end of the simulation time.
+
+    Attributes:
+        events (list): Heap of tuples (time, kind).
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def schedule(self, event_time: int, kind: str):
+        """
+        Add an event to the calendar.
+
+        Args:
+            event_time (int): Second of the internal clock where the event happens.
+            kind (str): Description of the event.
+        """
+
+        heappush(self.events, (event_time, kind))
+
+    def next_time(self, clock: int):
+        """
+        Discard the events that already happened and return the time of the next one.
+
+        Args:
+            clock (int): Current time of the internal clock.
+
+        Returns:
+            event_time (int|None): Time of the next event after clock. None if the calendar is empty.
+        """
+
+        while len(self.events) > 0 and self.events[0][0] <= clock:
+            heappop(self.events)
+
+        if len(self.events) > 0:
+            return self.events[0][0]
+        else:
+            return None
 
 ## SCREEN CLASS WAS RETRIEVED FROM A PAST PROJECT. It could be improved.
 class Screen:
     """
     This class graphically represents the environment. The objects should be integrated in a layout.
+    The layout stores one small integer per tile (tile code); the sprite of each code is kept in a palette and only used when a frame is printed.
 
     Args:
         environment (object): Environment that manages the simulation.
         width (int): Unit of measure is blank spaces in the command line.
         height (int): Unit of measure is blank spaces in the command line.
         border_stye (str): Character delimiting the border of the layout. If no character desired, provide double blank space "  ". Optionally, it is suggested to used Border class in ELements module.
+
+    Attributes:
+        layout (object): numpy array (height, width) with the tile code of each tile; the code of a tile can be called using layout[y, x]. Use set_tile() to modify it.
+        palette (list): Sprite of each tile code.
+        tile_codes (dict): Tile code of each sprite.
+        rendered (object|None): Copy of the layout printed in the last frame. None if the next frame must be printed completely.
+        status_lines (list): Lines of text printed under the layout in the last frame.
     """
 
     def __init__(self, environment: object, width: int , height: int, border_style: str):
@@ -383,52 +1265,222 @@ class Screen:
         self.height = height
         self.border_icon = border_style
         self.environment = environment
+        self.palette = []
+        self.tile_codes = {}
 
         self.environment.screen = self
+        self.environment.width = width
+        self.environment.height = height
         self.layout = self.build_layout()
+        self.rendered = None
+        self.status_lines = []
     
     def build_layout(self):
         """
         Build layout with the parameters provided when the object was initialized (width, height, and border). It is not necessary to call this method after the object initialization; the layout is automatically created.
 
         Returns:
-            layout (list): List containing the layout. The layout contains y list with x double-blank spaces. An element in the layout can be called using layout[y][x].
+            layout (object): numpy array (height, width) of tile codes: the border in the edges and double-blank spaces inside. An element in the layout can be called using layout[y, x].
         """
 
-        ud_border = []  # List containing the upper border.
-        for x in range(0, self.width) : # Generate the border from 0 to width.
-            ud_border.append(self.border_icon)
-        
-        layout = [] # List containing the rest of the layout.
-        layout.append(ud_border.copy())
+        import numpy as np     # Only needed when the animation is printed.
+        layout = np.full((self.height, self.width), self.tile_code(self.border_icon), dtype=np.uint8)
+        layout[1:-1, 1:-1] = self.tile_code("  ")
+        return layout
 
-        for y in range(0, self.height-2):  # Generate every row (x axis) of the layout from 0 to height value.
-            row = []
-            row.append(self.border_icon)
+    def tile_code(self, sprite: str):
+        """
+        Find the tile code of a sprite. New sprites are added to the palette.
 
-            for z in range(0, self.width-2):
-                row.append("  ")
-            row.append(self.border_icon)
-            layout.append(row)
+        Args:
+            sprite (str): Text printed in a tile (two characters wide).
 
-        layout.append(ud_border.copy())
-        return layout
+        Returns:
+            code (int)
+        """
+
+        code = self.tile_codes.get(sprite)
+        if code is None:
+            if len(self.palette) == 256:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La pantalla no admite más de 256 sprites distintos.")
+            code = len(self.palette)
+            self.palette.append(sprite)
+            self.tile_codes[sprite] = code
+        return code
 
-    def print_screen(self):
+    def set_tile(self, x_location: int, y_location: int, sprite: str):
         """
-        Print the layout in the "screen" class object.
+        Set a sprite in a tile of the layout. The tile is printed in the next frame if it changed.
+
+        Args:
+            x_location (int): Tile location in the x axis.
+            y_location (int): Tile location in the y axis.
+            sprite (str): Text printed in the tile (two characters wide).
         """
 
-        # Clean the last screen printed.    
-        functions.clear_screen()
+        self.layout[y_location, x_location] = self.tile_code(sprite)
+
+    def sprite(self, x_location: int, y_location: int):
+        """
+        Args:
+            x_location (int): Tile location in the x axis.
+            y_location (int): Tile location in the y axis.
+
+        Returns:
+            sprite (str): Sprite of the tile.
+        """
+
+        return self.palette[self.layout[y_location, x_location]]
+
+    def invalidate(self):
+        """
+        Print the whole screen in the next frame, e.g. after other text was printed in the terminal.
+        """
+
+        self.rendered = None
+
+    def print_screen(self, status_lines = []):
+        """
+        Print the layout in the "screen" class object, followed by the status lines.
+        The first frame (or the first after invalidate()) is printed completely. The following frames compare the layout with the last frame printed, move the cursor with ANSI codes and only print the tiles and status lines that changed. Each frame is written at once.
+
+        Args:
+            status_lines (list): Lines of text to print under the layout.
+        """
+
+        import numpy as np
+
+        frame = []
+
+        palette = self.palette
+
+        if self.rendered is None:
+            # Move the cursor home and clean the last screen printed; then print every row of the layout.
+            frame.append(colors.Cursor.home + colors.Cursor.clear_screen)
+            frame.append("\n".join("".join(palette[code] for code in row) for row in self.layout.tolist()))
+            frame.append("\n")
+            previous_lines = []
+        else:
+            for y_location, x_location in np.argwhere(self.layout != self.rendered).tolist():    # Changed tiles, row by row.
+                frame.append(colors.Cursor.position(y_location + 1, 2 * x_location + 1) + palette[self.layout[y_location, x_location]])   # Every tile is two characters wide.
+            previous_lines = self.status_lines
+
+        for i in range(max(len(status_lines), len(previous_lines))):
+            line = status_lines[i] if i < len(status_lines) else ""
+            if i >= len(previous_lines) or line != previous_lines[i]:
+                frame.append(colors.Cursor.position(self.height + 1 + i, 1) + line + colors.Cursor.clear_line)
+
+        frame.append(colors.Cursor.position(self.height + 1 + len(status_lines), 1))
+
+        self.rendered = self.layout.copy()
+        self.status_lines = list(status_lines)
+
+        sys.stdout.write("".join(frame))
+        sys.stdout.flush()
+
+def run_replication(simulation_parameters: dict, width: int, height: int, iteration: int, seed_sequence: object):
+    """
+    Run one iteration without animation in a new environment. This function is executed by the parallel workers of Environment.start().
+
+    Args:
+        simulation_parameters (dict): Parameters of the simulation.
+        width (int): Width of the supermarket in tiles.
+        height (int): Height of the supermarket in tiles.
+        iteration (int): Iteration number, starting at 0.
+        seed_sequence (object): numpy.random.SeedSequence used to seed the random numbers of this iteration.
+
+    Returns:
+        records (dict): RecordBuffer objects with the statistics of the iteration.
+        profiler (object|None): PhaseProfiler of the iteration, if the parameter profile is True.
+    """
+
+    environment = Environment()
+    environment.width = width
+    environment.height = height
+    environment.define_parameters(simulation_parameters)
+    environment.print_animation = False
+    environment.exporter = None     # The rows are saved by the main process.
+    environment.checkpoint_interval = None
+    environment.checkpoint_times = []
+    environment.profiler = PhaseProfiler() if environment.profile else None
+    environment.run_iteration(iteration, seed_sequence)
+
+    return environment.records, environment.profiler
+
+def load_checkpoint(path: str):
+    """
+    Load a simulation saved with Environment.save_checkpoint(). Use resume() to continue it.
+
+    Args:
+        path (str): Path of the checkpoint.
+
+    Returns:
+        environment (object): Environment in the state it had when the checkpoint was saved.
+    """
+
+    with gzip.open(path, "rb") as file:
+        environment = pickle.load(file)
+
+    if not isinstance(environment, Environment):
+        raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} \"{path}\" no es un checkpoint de la simulación.")
+    return environment
+
+def run_warm_replication(path: str, replication: int, seed_sequence: object):
+    """
+    Continue the iteration of a checkpoint without animation, with new random numbers. This function is executed by the parallel workers of warm_start().
+
+    Args:
+        path (str): Path of the checkpoint.
+        replication (int): Replication number, starting at 0. It is saved in the column "Iteración".
+        seed_sequence (object): numpy.random.SeedSequence used to seed the random numbers of this replication.
+
+    Returns:
+        records (dict): RecordBuffer objects with the statistics of the replication.
+    """
+
+    environment = load_checkpoint(path)
+    environment.print_animation = False
+    environment.exporter = None
+    environment.profiler = None
+    environment.checkpoint_interval = None
+    environment.checkpoint_times = []
+    environment.next_checkpoint = infinite
+    for record in environment.records.values():     # Rows before the checkpoint are the same in every replication.
+        record.clear()
+
+    environment.i = replication + 1
+    environment.reseed(seed_sequence)
+    environment.continue_iteration()
+    return environment.records
+
+def warm_start(path: str, replications: int, seed = None, workers = 1):
+    """
+    Run many replications of the rest of a day from the same checkpoint (e.g. a mid-day state), instead of simulating the morning again in each one. Each replication receives different random numbers from the checkpoint on.
+    The customers table only contains the customers that left after the checkpoint; the cashier tables contain the whole day.
+
+    Args:
+        path (str): Path of the checkpoint.
+        replications (int): Quantity of replications.
+        seed (int|None): Master seed of the replications. If None, a random seed is used.
+        workers (int): Quantity of processes that run the replications in parallel. If it is 1, replications run one after another in this process.
+
+    Returns:
+        statistics (dict): One DataFrame per table ("cashier_usage", "customers" and "cashier_per_hour"), with the replication number in "Iteración".
+    """
 
-        # First, it iterates every sublist in the list "layout". Then, it iterates every item in the sublist.
-        # It concatenates every item in the sublist to create a row. It prints the row.
-        rows = []
-        for line in self.layout:
-            row = "".join(line)
-            rows.append(row)
+    if replications < 1:
+        raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad mínima de replicaciones es {colors.Regular.bold}{1}{colors.Text.end}.")
 
-        output = "\n".join(rows)
+    from numpy.random import SeedSequence
+    seed_sequences = SeedSequence(seed).spawn(replications)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_warm_replication, repeat(path), range(replications), seed_sequences))
+    else:
+        results = [run_warm_replication(path, replication, seed_sequences[replication]) for replication in range(replications)]
 
-        print(output, end="\n")
\ No newline at end of file
+    records = results[0]
+    for result in results[1:]:
+        for k, record in result.items():
+            records[k].extend(record)
+    return {k: record.to_dataframe() for k, record in records.items()}
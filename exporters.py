@@ -0,0 +1,287 @@
+## This module contains the writers used to save the statistics of the simulation in files.
+## CSV, Parquet and Feather writers save the rows in chunks while the simulation runs, so the rows that were saved are kept on disk even if the simulation stops; Excel writes each table once, when the simulation ends.
+
+
+# Modules to use in this file:
+from abc import ABC, abstractmethod     # Exporters must implement write() and read().
+import os                   # Paths of the files.
+from collections.abc import Mapping     # Tables read from the files when they are requested.
+from datetime import timedelta  # Hours written in Excel.
+from glob import glob       # Finds the part files of a table.
+import colors               # Custom module: Allows to modify printed text.
+# pandas is imported by the methods that need it, so creating an exporter does not load it before the simulation starts.
+
+class Exporter(ABC):
+    """
+    Parent class. Inherited classes must implement write() and read(). Writes the statistics tables (e.g. "customers") in files whose name starts with the table name and ends with a time stamp.
+
+    Args:
+        time_stamp (str): Text added to the name of every file, e.g. the date and time when the simulation started.
+
+    Attributes:
+        streaming (bool): If True, rows are written in chunks while the simulation runs; if False, each table is written once with all its rows.
+        files (dict): Path of the file (or folder) of each table that was written.
+    """
+
+    streaming = True
+    extension = ""
+
+    def __init__(self, time_stamp: str):
+        self.time_stamp = time_stamp
+        self.files = {}
+
+    def path(self, name: str):
+        """
+        Args:
+            name (str): Name of the table.
+
+        Returns:
+            path (str): Path of the file (or folder) of the table.
+        """
+
+        return f"{name}-{self.time_stamp}.{self.extension}"
+
+    @abstractmethod
+    def write(self, name: str, df: object):
+        """
+        Write rows of a table. If streaming is True, the rows are added after the rows written before.
+
+        Args:
+            name (str): Name of the table.
+            df (object): DataFrame with the rows.
+        """
+
+    @abstractmethod
+    def read(self, name: str, columns: dict):
+        """
+        Read all the rows written of a table.
+
+        Args:
+            name (str): Name of the table.
+            columns (dict): Name and data type of each column (see RecordBuffer); used to create an empty table if no rows were written.
+
+        Returns:
+            df (object): DataFrame with the rows.
+        """
+
+    def close(self):
+        """
+        Finish writing the files.
+        """
+
+        pass
+
+    def checkpoint(self):
+        """
+        Keep the quantity of rows written in each file, when a checkpoint of the simulation is saved.
+        """
+
+        pass
+
+    def restore(self):
+        """
+        Remove the rows written after the last checkpoint, when a simulation is resumed from it.
+        """
+
+        pass
+
+    @staticmethod
+    def empty_table(columns: dict):
+        import pandas as pd
+
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in columns.items()})
+
+class CSVExporter(Exporter):
+    """
+    Inherited class from Exporter.
+    One CSV file per table. Each chunk is appended at the end of the file. Times are written in seconds.
+    """
+
+    extension = "csv"
+
+    def __init__(self, time_stamp: str):
+        super().__init__(time_stamp)
+        self.sizes = {}     # Size in bytes of each file at the last checkpoint.
+
+    def write(self, name: str, df: object):
+        import pandas as pd
+
+        path = self.path(name)
+        header = name not in self.files
+        df = df.copy()
+        for column in df.columns:
+            if pd.api.types.is_timedelta64_dtype(df[column]):
+                df[column] = df[column].dt.total_seconds().astype("int64")
+
+        with open(path, "a" if not header else "w", newline="", encoding="utf-8") as file:
+            df.to_csv(file, header=header, index=False)
+        self.files[name] = path
+
+    def read(self, name: str, columns: dict):
+        import pandas as pd
+
+        if name not in self.files:
+            return self.empty_table(columns)
+
+        df = pd.read_csv(self.files[name])
+        for column, dtype in columns.items():
+            if dtype == "timedelta64[s]":
+                df[column] = df[column].astype("timedelta64[s]")
+        return df
+
+    def checkpoint(self):
+        self.sizes = {name: os.path.getsize(path) for name, path in self.files.items()}
+
+    def restore(self):
+        for name, path in self.files.items():
+            with open(path, "r+b") as file:
+                file.truncate(self.sizes[name])
+
+class PartsExporter(Exporter):
+    """
+    Inherited class from Exporter.
+    One folder per table, with one file per chunk ("part-00000", "part-00001", …). Each part is a complete file, so the parts written are readable even if the simulation stops.
+    Inherited classes must implement write_part() and read_part(). Requires pyarrow.
+    """
+
+    def __init__(self, time_stamp: str):
+        try:
+            import pyarrow
+        except ImportError:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Se requiere pyarrow para exportar en formato {self.extension}.")
+
+        super().__init__(time_stamp)
+        self.parts = {}
+
+    def write(self, name: str, df: object):
+        folder = self.path(name)
+        if name not in self.files:
+            os.makedirs(folder, exist_ok=True)
+            for part in glob(os.path.join(folder, f"part-*.{self.extension}")):    # Parts written after a checkpoint that was resumed.
+                os.remove(part)
+            self.files[name] = folder
+            self.parts[name] = 0
+
+        self.write_part(df.reset_index(drop=True), os.path.join(folder, f"part-{self.parts[name]:05d}.{self.extension}"))
+        self.parts[name] += 1
+
+    def read(self, name: str, columns: dict):
+        import pandas as pd
+
+        if name not in self.files:
+            return self.empty_table(columns)
+
+        parts = sorted(glob(os.path.join(self.files[name], f"part-*.{self.extension}")))
+        return pd.concat([self.read_part(part) for part in parts], ignore_index=True)
+
+    @abstractmethod
+    def write_part(self, df: object, path: str):
+        """
+        Write a chunk of rows in a new file.
+
+        Args:
+            df (object): DataFrame with the rows.
+            path (str): Path of the part.
+        """
+
+    @abstractmethod
+    def read_part(self, path: str):
+        """
+        Args:
+            path (str): Path of a part.
+
+        Returns:
+            df (object): DataFrame with the rows of the part.
+        """
+
+    def restore(self):
+        for name, folder in self.files.items():
+            for part in glob(os.path.join(folder, f"part-*.{self.extension}")):
+                if int(os.path.basename(part)[5:10]) >= self.parts[name]:
+                    os.remove(part)
+
+class ParquetExporter(PartsExporter):
+    """
+    Inherited class from PartsExporter. Parts are Parquet files.
+    """
+
+    extension = "parquet"
+
+    def write_part(self, df: object, path: str):
+        df.to_parquet(path, index=False)
+
+    def read_part(self, path: str):
+        import pandas as pd
+
+        return pd.read_parquet(path)
+
+class FeatherExporter(PartsExporter):
+    """
+    Inherited class from PartsExporter. Parts are Feather files.
+    """
+
+    extension = "feather"
+
+    def write_part(self, df: object, path: str):
+        df.to_feather(path)
+
+    def read_part(self, path: str):
+        import pandas as pd
+
+        return pd.read_feather(path)
+
+class ExcelExporter(Exporter):
+    """
+    Inherited class from Exporter.
+    One Excel workbook per table, written when the simulation ends (Excel files cannot be extended by chunks). Requires openpyxl.
+    """
+
+    streaming = False
+    extension = "xlsx"
+
+    def write(self, name: str, df: object):
+        path = self.path(name)
+        df = df.copy()
+        for column in df.columns:   # Excel shows durations as fractions of a day; hours are written as text (e.g. "7:05:04"), as in the reports of the simulation.
+            if df[column].dtype.kind == "m":
+                df[column] = [str(timedelta(seconds=int(t.total_seconds()))) if t == t else "" for t in df[column]]
+        df.to_excel(path)
+        self.files[name] = path
+
+    def read(self, name: str, columns: dict):
+        import pandas as pd
+
+        if name not in self.files:
+            return self.empty_table(columns)
+
+        df = pd.read_excel(self.files[name], index_col=0)
+        for column, dtype in columns.items():
+            if dtype == "timedelta64[s]":
+                df[column] = pd.to_timedelta(df[column].astype(str)).astype(dtype)
+        return df
+
+class ExportedTables(Mapping):
+    """
+    Statistics tables whose rows were written by a streaming exporter. A table is read from its files each time it is requested (e.g. statistics["customers"]), so the rows are not kept in memory when the simulation ends.
+
+    Args:
+        exporter (object): Streaming exporter that wrote the tables.
+        columns (dict): Columns of each table (name and data type, see RecordBuffer).
+    """
+
+    def __init__(self, exporter: object, columns: dict):
+        self.exporter = exporter
+        self.columns = columns
+
+    def __getitem__(self, name: str):
+        if name not in self.columns:
+            raise KeyError(name)
+        return self.exporter.read(name, self.columns[name])
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+formats = {"csv": CSVExporter, "parquet": ParquetExporter, "feather": FeatherExporter, "excel": ExcelExporter}   # Valid values of the parameter "export_format".
@@ -1,28 +1,8 @@
 ## This module contains additional functions needed to simplify this simulation.
 
 # Modules to use in this file:
-from itertools import zip_longest       # Merge list of different sizes.
-from numpy import nan, mean
-from numpy import random as np_random   # To generate a random number using exponential average.
-from random import random   # To create random values.
+from math import inf as infinite
 import colors               # To print in colors.
-import os                   # To access system commands.
-import pandas as pd
-
-def clear_screen():
-    """
-    Clear all text in the terminal.
-    """
-
-    # If system is macOS or Linux, it will use "clear" command.
-    if os.name == "posix":
-        os.system("clear")
-    # Else, if it's Windows, it will use "CLS".
-    elif os.name == "nt":
-         os.system("CLS")
-    # If a system doesn't match any of this conditions, it will display an error.
-    else:
-        print("Function not compatible with the current os.")
 
 def generate_cashiers_n(environment: object, quantity: int, y_axis: int, average_scanning_time: int, dynamic_scanning_time: bool, x_locations = [], align = "auto") :
     """
@@ -33,12 +13,11 @@ def generate_cashiers_n(environment: object, quantity: int, y_axis: int, average
         quantity (int): Quantity of cashiers.
         y_axis (int): Y axis position in the layout where the cashiers will be located.
         x_locations (list): List of locations in x axis where each cashier will be located.
-        algin (str): "auto" generate automatically the x positions for each cashier based in the size of the the screen. This paramentes is "auto" by default. If it is changed, it will be necessary to provide x_locations list.
+        algin (str): "auto" uses the x positions of the lanes of the layout (environment.store). This paramentes is "auto" by default. If it is changed, it will be necessary to provide x_locations list.
     """
 
     from entities import Cashier    # Agent
-    screen_width = environment.screen.width
-    max_quantity = int((screen_width-2) // 3)   # Calculates the maximum quantity that is possible in for the current layout.
+    max_quantity = len(environment.store.lane_x_locations)   # Quantity of lanes of the layout.
     
     if quantity > max_quantity:    # If the requested quantity is higher than the capacity, it prints a color warning for user and stops the execution.
         raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad máxima de cajeros es {colors.Regular.bold}{max_quantity}{colors.Text.end}.")
@@ -46,21 +25,8 @@ def generate_cashiers_n(environment: object, quantity: int, y_axis: int, average
     if quantity <= 0:    # If the requested quantity is higher than the capacity, it prints a color warning for user and stops the execution.
         raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad mínima de cajeros es {colors.Regular.bold}{1}{colors.Text.end}.")
 
-    if align == "auto":    # If user selected "auto", generates x positions.
-        n = (screen_width // 2)
-        left_list = []
-        while n > 0:
-            left_list.append(int(n) - 1)
-            n -= 3
-
-        n = (screen_width // 2) + 3
-        right_list = []
-        while n < screen_width - 1:
-            right_list.append(int(n) - 1)
-            n += 3
-
-        x_locations = [x for pair in zip_longest(left_list, right_list) for x in pair if x is not None]
-        #x_locations.sort(reverse=True)
+    if align == "auto":    # If user selected "auto", uses the lanes of the layout in their opening order.
+        x_locations = environment.store.lane_x_locations
 
     for i in range(0,quantity):
         cashier = Cashier(environment, x_locations[i], y_axis, dynamic_scanning_time, average_scan_speed=average_scanning_time)
@@ -69,23 +35,8 @@ def generate_cashiers_n(environment: object, quantity: int, y_axis: int, average
 
 def generate_cashiers(environment: object, y_axis: int, average_scanning_time: int, dynamic_scanning_time: bool):
     from entities import Cashier    # Agent
-    screen_width = environment.screen.width
-    max_quantity = int((screen_width-2) // 3)   # Calculates the maximum quantity that is possible in for the current layout.
-
-    n = (screen_width // 2)
-    left_list = []
-    while n > 0:
-        left_list.append(int(n) - 1)
-        n -= 3
-
-    n = (screen_width // 2) + 3
-    right_list = []
-    while n < screen_width - 1:
-        right_list.append(int(n) - 1)
-        n += 3
-
-    x_locations = [x for pair in zip_longest(left_list, right_list) for x in pair if x is not None]
-    #x_locations.sort(reverse=True)
+    x_locations = environment.store.lane_x_locations   # Lanes of the layout, in their opening order.
+    max_quantity = len(x_locations)
 
     for i in range(0,max_quantity):
         cashier = Cashier(environment, x_locations[i], y_axis, dynamic_scanning_time, average_scan_speed=average_scanning_time)
@@ -107,60 +58,120 @@ def check_time_scale(scale: float):
     else:
         return scale
 
-def generate_exponential_arrival_time(n: int, m: int):
+def generate_arrival_schedule(arrival_time: list, distribution: str, generator: object, replications = 1, stop = infinite):
     """
-    Generate a list of arrival times using numpy.random.exponential.
+    Generate the arrival times of a whole day at once, for one or more replications (independent days).
+    The time between two arrivals follows the distribution with the average arrival time of the period where the first of them arrived. For each period, the times between arrivals of every replication are drawn together and accumulated with numpy.cumsum.
+    Arrivals stop at the first period with average arrival time 0 (the store closes) or at stop.
 
     Args:
-        n (int): Number of times to generate.
-        m (int): Average arrival time in seconds.
+        arrival_time (list): Arrival distribution; format is [[t1, arrival_time], [t2, arrival_time], …, [tn, arrival_time]]. The first arrival happens after t1.
+        distribution (str): "exponential" or "poisson".
+        generator (object): numpy.random.Generator used to draw the times.
+        replications (int): Quantity of replications. Default is 1.
+        stop (float): Time when arrivals stop if the store does not close before. It must be finite if the last period has an average arrival time greater than 0.
 
     Returns:
-        arrival_times (list): List of arrival times.
+        arrival_times (list): One sorted numpy array of arrival times (seconds) per replication.
     """
-    arrival_times = []  # List to store arrival times.
-    for i in range(n): # Repete this code n times.
-        arrival_time = np_random.exponential(m)
-        if i == 0: # If there is no first arrival time, generate one.
-            arrival_times.append(round(arrival_time))
-        else:
-            arrival_times.append(round(arrival_times[i - 1] + arrival_time)) # Generate one arrival time an sum it to the last.
-    return arrival_times
-
-def generate_cashier_queue(screen: object, cashier: object):
+
+    import numpy as np  # Vectorized random arrival times.
+
+    match distribution:
+        case "exponential" | "":
+            draw = generator.exponential
+        case "poisson":
+            draw = generator.poisson
+        case _:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Distribución estadística no compatible para arrival_time_distribution.")
+
+    current = np.full(replications, float(arrival_time[0][0]))    # Last arrival of each replication.
+    closing_time = stop
+    replication_ids = []
+    times = []
+
+    for i in range(0, len(arrival_time)):
+        mean_time = arrival_time[i][1]
+        if mean_time == 0:
+            closing_time = min(closing_time, arrival_time[i][0])
+            break
+
+        period_end = min(arrival_time[i + 1][0] if i + 1 < len(arrival_time) else infinite, stop)
+        if period_end == infinite:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} El último periodo de arrival_time debe tener tiempo promedio 0, o se debe indicar simulation_time.")
+
+        rows = np.flatnonzero(current < period_end) # Replications whose last arrival is in this period.
+        while len(rows) > 0:
+            n = int((period_end - current[rows].min()) / mean_time * 1.1) + 16    # Enough arrivals to reach the end of the period in almost every replication.
+            period_times = current[rows, None] + np.cumsum(draw(mean_time, size=(len(rows), n)), axis=1)
+            inside = (period_times < period_end).sum(axis=1)
+            kept = np.minimum(inside + 1, n)   # The first arrival after the end of the period is also kept, it was drawn with this period's average.
+
+            replication_ids.append(np.repeat(rows, kept))
+            times.append(period_times[np.arange(n) < kept[:, None]])
+            current[rows] = period_times[np.arange(len(rows)), kept - 1]
+
+            rows = rows[inside == n]    # Replications that did not reach the end of the period draw more arrivals.
+
+    if len(times) == 0:
+        return [np.array([]) for r in range(replications)]
+
+    replication_ids = np.concatenate(replication_ids)
+    times = np.concatenate(times)
+    before_closing = times < closing_time
+    replication_ids = replication_ids[before_closing]
+    times = times[before_closing]
+
+    order = np.argsort(replication_ids, kind="stable")   # Arrivals of each replication were added in order.
+    counts = np.bincount(replication_ids, minlength=replications)
+
+    return np.split(times[order], np.cumsum(counts)[:-1])
+
+def generate_cashier_queue(environment: object, cashier: object):
     """
-    Generate the graphical cashier's queue.
+    Generate the cashier's queue. If the environment has a screen, the queue is also drawn in the layout.
 
     Args:
-        screen (object): Screen where this function will be used.
+        environment (object): Environment where the cashier interacts.
         cashier (object): Cashier to create a queue.
     """
-    from elements import Queue  # Queue class generates the queue tiles as object.
-    for i in range(cashier.y_location + 1, len(screen.layout) - 2): # Create the queue from the main queue to the front of cashier.
-        Queue().set_in_screen(screen, cashier.x_location + 1, i)
+    import elements  # Shared Queue element draws the queue tiles.
+    for i in range(cashier.y_location + 1, environment.height - 2): # Create the queue from the main queue to the front of cashier.
+        environment.clear_tile(cashier.x_location + 1, i, elements.queue)
 
-def delete_cashier_queue(screen: object, cashier: object):
-    from elements import Void
-    for i in range(cashier.y_location + 1, len(screen.layout) - 2): # Create the queue from the main queue to the front of cashier.
-        Void().set_in_screen(screen, cashier.x_location + 1, i)
+def delete_cashier_queue(environment: object, cashier: object):
+    import elements
+    for i in range(cashier.y_location + 1, environment.height - 2): # Create the queue from the main queue to the front of cashier.
+        environment.clear_tile(cashier.x_location + 1, i, elements.void)
 
-def random_customer_kind(p_observer_kind: float):
+def random_customer_kind(p_observer_kind: float, random_stream: object):
     """
     Returns randomly "regular" or “observed“ based in a weight.
 
     Args:
         p_observer_kind (float): Probability a customer is observer.
+        random_stream (object): RandomStream of the iteration (module "randomness").
     
     Returns:
         string: "regular" or "observer"
     """
-    if random() < p_observer_kind:
+    if random_stream.uniform() < p_observer_kind:
         return "observer"
     else:
         return "regular"
     
-def safe_rounded_mean(data: list):
-    if len(data) > 0:
-        return round(mean(data))
-    else:
-        return 0
\ No newline at end of file
+def rounded_summary(statistic: object):
+    """
+    Summary of a StreamingStatistic for the statistics tables.
+
+    Args:
+        statistic (object|None): StreamingStatistic with quantiles 0.5, 0.9 and 0.99. None if there are no samples.
+
+    Returns:
+        summary (tuple): Rounded mean, standard deviation, p50, p90 and p99. Every value is 0 if there are no samples.
+    """
+
+    if statistic is None:
+        return (0, 0, 0, 0, 0)
+
+    return (round(statistic.mean), round(statistic.standard_deviation()), round(statistic.quantile(0.5)), round(statistic.quantile(0.9)), round(statistic.quantile(0.99)))
\ No newline at end of file
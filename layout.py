@@ -0,0 +1,125 @@
+## This module contains the logical model of the supermarket: size of the grid, checkout lanes and entrances.
+## The simulation only uses this model to place the agents; the terminal screen is optional and only draws it. A layout can be generated for any quantity of lanes or loaded from a JSON file (parameter "layout").
+
+
+# Modules to use in this file:
+from itertools import zip_longest       # Merge list of different sizes.
+import json
+import colors   # Custom module: Allows to modify printed text.
+
+class StoreLayout:
+    """
+    Grid of the supermarket. Customers enter in the main queue (row height - 2) through an entrance, walk along it to the lane of their cashier and up the lane to the cashier (row cashiers_y_axis); after paying, they walk up to the row 0 and leave.
+
+    Args:
+        width (int): Width of the supermarket in tiles.
+        height (int): Height of the supermarket in tiles.
+        cashiers_y_axis (int): Row of the cashiers.
+        lane_x_locations (list): X location of each cashier, in the order they are opened; its lane is the column x + 1.
+        entrances (list): X locations of the main queue where customers enter. Default is [0].
+
+    Attributes:
+        main_row (int): Row of the main queue.
+        lane_length (int): Tiles of each lane between the main queue and the cashier. All the lanes have the same length: lanes of different lengths are not supported, because customers who change queue walk across the lanes in the row where they are.
+        queue_walk (int): Steps from the main queue to a cashier. Every customer walks them after entering the lane of their cashier, so they are part of "Tiempo fila" (see queueing.environment_estimate()).
+    """
+
+    def __init__(self, width: int, height: int, cashiers_y_axis: int, lane_x_locations: list, entrances = [0]):
+        self.width = width
+        self.height = height
+        self.cashiers_y_axis = cashiers_y_axis
+        self.lane_x_locations = list(lane_x_locations)
+        self.entrances = list(entrances)
+        self.main_row = height - 2
+        self.lane_length = self.main_row - 1 - cashiers_y_axis
+        self.queue_walk = self.main_row - cashiers_y_axis
+
+        if not 0 < cashiers_y_axis < self.main_row - 1:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} cashiers_y_axis debe estar entre {colors.Regular.bold}1{colors.Text.end} y {colors.Regular.bold}{self.main_row - 2}{colors.Text.end}.")
+        if len(set(self.lane_x_locations)) != len(self.lane_x_locations) or any(not 0 <= x < width - 2 for x in self.lane_x_locations):
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Las posiciones de los cajeros deben ser distintas y estar entre {colors.Regular.bold}0{colors.Text.end} y {colors.Regular.bold}{width - 3}{colors.Text.end}.")
+        if len(self.entrances) == 0 or any(not 0 <= x < width - 1 for x in self.entrances):
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Las entradas deben estar entre {colors.Regular.bold}0{colors.Text.end} y {colors.Regular.bold}{width - 2}{colors.Text.end}.")
+
+    @classmethod
+    def from_size(cls, width: int, height: int, cashiers_y_axis: int):
+        """
+        Original layout of the simulation: one cashier every 3 columns, opened from the center to the sides, and the entrance at the left end of the main queue.
+
+        Args:
+            width (int): Width of the supermarket in tiles.
+            height (int): Height of the supermarket in tiles.
+            cashiers_y_axis (int): Row of the cashiers.
+
+        Returns:
+            layout (StoreLayout)
+        """
+
+        max_quantity = int((width - 2) // 3)   # Calculates the maximum quantity that is possible in for the current layout.
+
+        n = (width // 2)
+        left_list = []
+        while n > 0:
+            left_list.append(int(n) - 1)
+            n -= 3
+
+        n = (width // 2) + 3
+        right_list = []
+        while n < width - 1:
+            right_list.append(int(n) - 1)
+            n += 3
+
+        x_locations = [x for pair in zip_longest(left_list, right_list) for x in pair if x is not None]
+        return cls(width, height, cashiers_y_axis, x_locations[:max_quantity])
+
+    @classmethod
+    def generate(cls, lanes: int, lane_length = 12, exit_length = 15, entrances = None):
+        """
+        Layout with the given quantity of lanes, with the same spacing and opening order as the original layout (see from_size()): one cashier every 3 columns, from the center to the sides. generate(9) is the original 30x30 layout.
+
+        Args:
+            lanes (int): Quantity of cashiers.
+            lane_length (int): Tiles of each lane between the main queue and the cashier. Default is 12, as in the original layout.
+            exit_length (int): Rows between the cashiers and the exit (row 0). Default is 15, as in the original layout.
+            entrances (list|None): X locations of the entrances in the main queue. If None, there is one entrance at the left end.
+
+        Returns:
+            layout (StoreLayout)
+        """
+
+        if lanes <= 0:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad mínima de cajeros es {colors.Regular.bold}{1}{colors.Text.end}.")
+
+        center = (lanes - 1) // 2
+        order = [i for pair in zip_longest(range(center, -1, -1), range(center + 1, lanes)) for i in pair if i is not None]
+        return cls(3 * lanes + 3, exit_length + lane_length + 3, exit_length, [3 * i + 2 for i in order], [0] if entrances is None else entrances)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read a layout from a JSON file. The file contains the arguments of generate() (e.g. {"lanes": 120, "entrances": [0, 180]}) or the ones of StoreLayout (width, height, cashiers_y_axis, lane_x_locations and entrances).
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            layout (StoreLayout)
+        """
+
+        with open(path, encoding="utf-8") as file:
+            description = json.load(file)
+
+        try:
+            if "lanes" in description:
+                return cls.generate(**description)
+            return cls(**description)
+        except TypeError:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} El archivo de layout \"{path}\" tiene parámetros desconocidos o incompletos.")
+
+    def to_dict(self):
+        """
+        Returns:
+            description (dict): Arguments of StoreLayout that create this layout (e.g. to save it in a JSON file).
+        """
+
+        return {"width": self.width, "height": self.height, "cashiers_y_axis": self.cashiers_y_axis, "lane_x_locations": self.lane_x_locations, "entrances": self.entrances}
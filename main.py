@@ -4,21 +4,26 @@ from parameters import simulation_parameters
 import elements     # Custom module: Provides graphical objects the agents can interact with.
 import environment  # Custom module: Simulation manager.  
 
-## Simulation initialization
-simulation = environment.Environment()   # Controls the simulation with an internal clock.
-screen = environment.Screen(simulation,30,30,elements.Border.none)  # Creates the simulation graphical layout.
+if __name__ == "__main__":  # Parallel workers may import this file again; the simulation must only start in the main process.
+    ## Simulation initialization
+    simulation = environment.Environment()   # Controls the simulation with an internal clock.
 
-## Layout customization.
-outer_wall = elements.Wall(None)
-for x in range(0, 30):
-    outer_wall.set_in_screen(screen, x, 29)   # Crea el borde inferior
-for y in range(1, 29):
-    outer_wall.set_in_screen(screen, 29, y)   # Crea el borde derecho
-for y in range(1, 28):
-    outer_wall.set_in_screen(screen, 0, y)    # Crea el borde izquierdo
-for x in range(0, 29):
-    elements.Queue().set_in_screen(screen, x, 28) # Crea la fila principal
+    simulation.define_parameters(simulation_parameters)
+    store = simulation.build_store()    # Logical layout of the supermarket; the screen only draws it.
 
-## Simulation
-simulation.define_parameters(simulation_parameters)
-simulation.start()
\ No newline at end of file
+    if simulation_parameters["print_animation"]:    # The screen is only needed to print the animation; without it, the agents only use their own positions.
+        screen = environment.Screen(simulation,store.width,store.height,elements.Border.none)  # Creates the simulation graphical layout.
+
+        ## Layout customization.
+        outer_wall = elements.Wall(None)
+        for x in range(0, store.width):
+            outer_wall.set_in_screen(screen, x, store.height - 1)   # Crea el borde inferior
+        for y in range(1, store.height - 1):
+            outer_wall.set_in_screen(screen, store.width - 1, y)   # Crea el borde derecho
+        for y in range(1, store.main_row):
+            outer_wall.set_in_screen(screen, 0, y)    # Crea el borde izquierdo
+        for x in range(0, store.width - 1):
+            elements.Queue().set_in_screen(screen, x, store.main_row) # Crea la fila principal
+
+    ## Simulation
+    simulation.start()
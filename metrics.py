@@ -0,0 +1,156 @@
+## This module contains the accumulators used to summarize the samples taken during the simulation (waiting time, queue length, attention time).
+## Samples are not stored: each accumulator keeps a fixed quantity of numbers, no matter how long the simulation runs.
+
+
+# Modules to use in this file:
+from math import sqrt
+
+class P2Quantile:
+    """
+    Online estimation of a quantile with the P² algorithm (Jain and Chlamtac, 1985). Five markers are kept and adjusted with each sample, so the memory does not grow with the quantity of samples.
+    While there are less than five samples, the exact quantile is returned.
+
+    Args:
+        p (float): Quantile to estimate, between 0 and 1 (e.g. 0.9 for the 90th percentile).
+
+    Attributes:
+        heights (list): Height of each marker. The middle marker is the estimation of the quantile.
+        positions (list): Actual position of each marker.
+        desired_positions (list): Position where each marker should be.
+    """
+
+    __slots__ = ("p", "heights", "positions", "desired_positions", "increments")
+
+    def __init__(self, p: float):
+        self.p = p
+        self.heights = []
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired_positions = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        """
+        Add a sample.
+
+        Args:
+            x (float): Value of the sample.
+        """
+
+        q = self.heights
+
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired_positions[i] += self.increments[i]
+
+        for i in (1, 2, 3):     # Adjust the height of the middle markers if they are out of place.
+            d = self.desired_positions[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * ((n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))    # Parabolic prediction.
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])     # Linear prediction.
+                q[i] = height
+                n[i] += d
+
+    def value(self):
+        """
+        Returns:
+            value (float): Estimation of the quantile. 0 if there are no samples.
+        """
+
+        q = self.heights
+
+        if len(q) == 0:
+            return 0
+        if len(q) < 5:  # Exact quantile with linear interpolation.
+            position = self.p * (len(q) - 1)
+            i = int(position)
+            if i + 1 < len(q):
+                return q[i] + (position - i) * (q[i + 1] - q[i])
+            return q[i]
+
+        return q[2]
+
+class StreamingStatistic:
+    """
+    Count, mean and variance of a set of samples (Welford's algorithm), and an estimation of some quantiles (P²). Samples are not stored.
+
+    Args:
+        quantiles (tuple): Quantiles to estimate. Default is (0.5, 0.9, 0.99).
+
+    Attributes:
+        count (int): Quantity of samples.
+        mean (float): Mean of the samples. 0 if there are no samples.
+        quantiles (dict): P2Quantile of each quantile.
+    """
+
+    __slots__ = ("count", "mean", "m2", "quantiles")
+
+    def __init__(self, quantiles = (0.5, 0.9, 0.99)):
+        self.count = 0
+        self.mean = 0
+        self.m2 = 0     # Sum of the squared differences from the mean.
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, x: float):
+        """
+        Add a sample.
+
+        Args:
+            x (float): Value of the sample.
+        """
+
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+        for quantile in self.quantiles.values():
+            quantile.add(x)
+
+    def variance(self):
+        """
+        Returns:
+            variance (float): Sample variance. 0 if there are less than two samples.
+        """
+
+        if self.count < 2:
+            return 0
+        return self.m2 / (self.count - 1)
+
+    def standard_deviation(self):
+        """
+        Returns:
+            standard_deviation (float): Sample standard deviation. 0 if there are less than two samples.
+        """
+
+        return sqrt(self.variance())
+
+    def quantile(self, p: float):
+        """
+        Args:
+            p (float): One of the quantiles given when the statistic was created.
+
+        Returns:
+            value (float): Estimation of the quantile. 0 if there are no samples.
+        """
+
+        return self.quantiles[p].value()
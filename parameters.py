@@ -5,6 +5,7 @@ simulation_parameters = {
     # Running parameters
     "print_animation": True,                    # Listo
     "time_scale": 0.005,                        # Listo
+    "frames_per_second": 30,
     "dynamic_arrival_time": True,               # Listo
     "dynamic_cashier_generation": True,         # Listo
     "dynamic_scanning_time": False,              # Listo
@@ -12,12 +13,26 @@ simulation_parameters = {
     "simulation_time": infinite,                # Listo
     "arrival_time_distribution": "poisson", # Listo
     "iterations": 1,
+    "engine": "clocked",                        # "clocked" or "events"
+    "workers": 1,                               # Parallel processes for iterations
+    "seed": None,
+    "check_invariants": False,                  # Debug mode
+    "export_format": "excel",                   # "csv", "parquet", "feather", "excel" or None
+    "export_chunk_size": 4096,
+    "profile": False,                           # Measure the phases of the simulation loop
+    "checkpoint_interval": None,                # Seconds between checkpoints
+    "checkpoint_times": [],
+    "checkpoint_file": "checkpoint-{iteration}-{clock}.pkl.gz",
+    "result_cache": "result_cache",             # Folder of saved results or None
+    "result_cache_size": 2 ** 30,               # Bytes
+    "bypass_cache": False,
 
     # Fixed parameters
     "arrival_time": market.Popular_Hours.saturday_modified, # Listo
     "scanning_time": 4,                                     # Listo
     "observer_customer_probability": 0.1,                   # Listo
     "cashiers_y_axis": 15,                                  # Listo
+    "layout": None,                                         # JSON file of the store layout
     "minimum_cart_items": 1,                                # Listo
     "maximum_cart_items": 100,                              # Listo
 
@@ -27,9 +42,11 @@ simulation_parameters = {
 
 """
 Running parameters:
-    print_animation (bool): Allow to turn on/off printing in screen the animation. Turning this feature off (False) allows to run the simulation  faster. Turning it on limits the simulation to 1 frame per 0.005 seconds (200 FPS).
+    print_animation (bool): Allow to turn on/off printing in screen the animation. Turning this feature off (False) allows to run the simulation  faster. Turning it on limits the simulation to the speed given by time_scale.
     
-    time_scale (float): In seconds; simulation prints a frame each t seconds. Scale is t:1 second. This parameter is only valid if "print_animation" is True. If print_animation is False, the simulation will run at the lowest time possible.
+    time_scale (float): In seconds; each second of the simulation lasts t seconds of real time. Scale is t:1 second (e.g. 1/600 shows 600 simulated seconds per real second). This parameter is only valid if "print_animation" is True. If print_animation is False, the simulation will run at the lowest time possible.
+
+    frames_per_second (float): Frames printed per second of real time when print_animation is True. Frames are printed independently of the simulated seconds; if printing a frame takes longer, the next frames are skipped. Default is 30.
 
     dynamic_arrival_time (bool): If True, a list containing the distribution of arrivals must be passed, if False, a fixed arrival time must be passed. This allows to add an arrival distribution similar to a real supermarket.
 
@@ -45,6 +62,32 @@ Running parameters:
 
     items_in_cart_distribution (str): "triangular" or "normal"
 
+    workers (int): Quantity of processes that run the iterations in parallel. If it is 1, iterations run one after another in this process. The animation can only be printed with 1 worker.
+
+    seed (int|None): Master seed. Each iteration receives an independent seed derived from it, so the same seed always produces the same statistics, with any quantity of workers. If None, a random seed is used.
+
+    check_invariants (bool): Debug mode. If True, after every second the running totals of each cashier's queue and the indexes of queues and customers are compared with a full recount, and an error is raised if they differ.
+
+    export_format (str|None): Format of the files where the statistics are saved: "csv", "parquet", "feather" or "excel". CSV, Parquet and Feather files are written in chunks while the simulation runs, so the rows saved are kept if the simulation stops; Excel files are written when the simulation ends. If None, no file is saved. Parquet and Feather require pyarrow.
+
+    export_chunk_size (int): Rows of a statistics table kept in memory before they are written in a file, when export_format is "csv", "parquet" or "feather".
+
+    profile (bool): If True, the real time and calls of each phase of the simulation loop (cashier schedule, cashiers, minute sample, arrivals, statistics, customer movement, queue switching, queue choice, render, invariants) and some counters (queue switch attempts, queue switches, record appends) are measured. They are printed when the simulation ends and can be obtained with Environment.profile_summary(). If False, the measurements are skipped.
+
+    checkpoint_interval (int|None): Seconds of the internal clock between two checkpoints of the same iteration, starting at the beginning of the iteration. A checkpoint is a compressed file with the complete state of the simulation (clock, cashiers and queues, customers, random numbers, pending arrivals and statistics not saved yet); environment.load_checkpoint() and Environment.resume() continue the simulation from it, and environment.warm_start() runs many replications from it. If None, checkpoints are only saved at checkpoint_times. Checkpoints are only saved with 1 worker.
+
+    checkpoint_times (list): Times of the internal clock (seconds of the day) when a checkpoint is saved, in every iteration.
+
+    checkpoint_file (str): Path of the checkpoint files; "{iteration}" and "{clock}" are replaced by the iteration number and the time of the internal clock.
+
+    result_cache (str|None): Folder where the statistics of finished simulations are saved, by a hash of the parameters that change them, the seed and the version of the simulator. If the same simulation is started again, its statistics are read from the folder instead of simulating (they are still saved with the exporter). Simulations without seed are not saved. If None, the cache is not used.
+
+    result_cache_size (int): Maximum size of the result_cache folder in bytes; the least recently used results are removed when it is bigger. Default is 1 GiB.
+
+    bypass_cache (bool): If True, the simulation is run even if its statistics are in result_cache, and the saved statistics are replaced.
+
+    engine (str): "clocked" evaluates every second of the simulation. "events" jumps the internal clock to the next event (arrival, service completion, cashier opening/closing or minute sample) when no agent is moving; recommended when print_animation is False.
+
 Fixed parameters:
     arrival_time (int|list): If dynamic_arrival_time is True, a list containing the distribution of time must be provided; format is [[t1, arrival_time], [t2, arrival_time], …, [tn, arrival_time]]. If dynamic_arrival_time is False, an integer must be passed, and all the customers will arrive at the same average arrival time, using the distribution in arrival_time_distribution.
 
@@ -54,6 +97,8 @@ Fixed parameters:
 
     cashiers_y_axis (int): All cashiers will be generated at the same y axis.
 
+    layout (str|None): Path of a JSON file with the layout of the supermarket (see layout.StoreLayout.load()), e.g. {"lanes": 200, "entrances": [0, 300]}. It defines the size of the supermarket, the lanes of the cashiers and the entrances, so the quantity of cashiers is not limited by the size of the terminal; width, height and cashiers_y_axis are replaced by the ones of the layout. If None, the supermarket is 30x30 tiles, with one cashier every 3 columns (9 cashiers) and the entrance at the left end of the main queue.
+
 Variable parameters:
     cashier_quantity (int|list): If dynamic_cashier_generation is True, a list containing the quantity of cashiers per hour must be provided; format is [[t1, n1], [t2, n2], …, [tn, n]]. If dynamic_cashier_generation is False, an integer must be passes and this fixed quantity of cashiers will be used from the beginning to the end of the simulation.
 """
\ No newline at end of file
@@ -0,0 +1,93 @@
+## This module contains the profiler used to measure where the simulation spends its time.
+## It is only created when the parameter "profile" is True; otherwise the simulation only checks that it does not exist.
+
+
+# Modules to use in this file:
+from time import perf_counter   # Precise timer.
+import colors   # Custom module: Allows to modify printed text.
+
+class PhaseProfiler:
+    """
+    Cumulative real time and quantity of calls of each phase of the simulation loop, and counters of events (e.g. queue switches).
+
+    Attributes:
+        seconds (dict): Cumulative real time of each phase, in seconds.
+        calls (dict): Quantity of times each phase was measured.
+        counters (dict): Value of each counter.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.counters = {}
+
+    def lap(self, phase: str, start: float):
+        """
+        Add the time since start to a phase.
+
+        Args:
+            phase (str): Name of the phase.
+            start (float): perf_counter() when the phase started.
+
+        Returns:
+            now (float): perf_counter() when the phase ended, so it can be used as start of the next phase.
+        """
+
+        now = perf_counter()
+        self.seconds[phase] = self.seconds.get(phase, 0) + now - start
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        return now
+
+    def count(self, counter: str, n = 1):
+        """
+        Increase a counter.
+
+        Args:
+            counter (str): Name of the counter.
+            n (int): Quantity to add. Default is 1.
+        """
+
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def merge(self, other: object):
+        """
+        Add the times, calls and counters of another profiler, e.g. the one of a parallel worker.
+
+        Args:
+            other (object): PhaseProfiler to add.
+        """
+
+        for phase, seconds in other.seconds.items():
+            self.seconds[phase] = self.seconds.get(phase, 0) + seconds
+            self.calls[phase] = self.calls.get(phase, 0) + other.calls[phase]
+        for counter, n in other.counters.items():
+            self.count(counter, n)
+
+    def summary(self):
+        """
+        Returns:
+            summary (dict): "phases" (seconds, calls and share of the total time of each phase, from the slowest) and "counters".
+        """
+
+        total = sum(self.seconds.values())
+        phases = {}
+        for phase in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            phases[phase] = {"seconds": self.seconds[phase], "calls": self.calls[phase], "share": self.seconds[phase] / total if total > 0 else 0}
+
+        return {"phases": phases, "counters": dict(self.counters)}
+
+    def print_summary(self):
+        """
+        Print the summary as a table.
+        """
+
+        summary = self.summary()
+
+        print(f"\n{colors.Regular.bold}Perfil de la simulación{colors.Text.end}")
+        print(f"{'Fase':<20}{'Segundos':>12}{'Llamadas':>12}{'%':>8}")
+        for phase, values in summary["phases"].items():
+            print(f"{phase:<20}{values['seconds']:>12.3f}{values['calls']:>12}{100 * values['share']:>8.1f}")
+
+        print(f"\n{colors.Regular.bold}Contadores{colors.Text.end}")
+        for counter, n in summary["counters"].items():
+            print(f"{counter:<28}{n:>12}")
@@ -0,0 +1,365 @@
+## This module estimates the waiting time, queue length and utilization of each period without simulating, with queueing theory formulas: Erlang C (M/M/c) corrected with the Allen–Cunneen approximation for the variability of arrivals and attention times (G/G/c).
+## Each period is assumed to be long enough to reach its steady state, and the walk of the customers to the queues and the queue switching are ignored; calibration_report() compares the estimation with a simulation.
+## Usage:
+##     import queueing
+##     table = queueing.estimate_table(market.Popular_Hours.saturday_modified, market.Quartiles.saturday, scanning_time=4)
+
+
+# Modules to use in this file:
+from bisect import bisect_right
+from collections import defaultdict
+from math import inf as infinite, exp, lgamma, log, sqrt
+from statistics import NormalDist   # Quantiles of the attention time when the scanning time is random.
+import colors   # Custom module: Allows to modify printed text.
+import pandas as pd
+
+quantiles = (0.5, 0.9, 0.99)    # Same quantiles as the per-cashier statistics of the simulation.
+
+columns = ["Hora inicio", "Hora fin",   # Same columns as the statistics table "cashier_per_hour" (without "Iteración" and "Cajero ID"), plus "Cajeros" and "Utilización".
+           "Tiempo promedio fila", "Desviación tiempo fila", "Tiempo fila p50", "Tiempo fila p90", "Tiempo fila p99",
+           "Longitud promedio fila", "Desviación longitud fila", "Longitud fila p50", "Longitud fila p90", "Longitud fila p99",
+           "Tiempo promedio atención", "Desviación tiempo atención", "Tiempo atención p50", "Tiempo atención p90", "Tiempo atención p99",
+           "Cajeros", "Utilización"]
+
+def erlang_c(c: int, a: float):
+    """
+    Probability that a customer has to wait in an M/M/c queue (Erlang C formula), calculated with the recursion of Erlang B.
+
+    Args:
+        c (int): Quantity of cashiers.
+        a (float): Offered load: arrival rate / attention rate. It must be less than c.
+
+    Returns:
+        probability (float)
+    """
+
+    b = 1
+    for k in range(1, c + 1):
+        b = a * b / (k + a * b)
+    return b / (1 - a / c * (1 - b))
+
+def cart_moments(minimum: int, maximum: int):
+    """
+    Mean and variance of the quantity of items in a cart (triangular distribution with the mode in the middle, rounded to an integer, as in RandomStream.cart_size()).
+
+    Args:
+        minimum (int): Minimum quantity of items.
+        maximum (int): Maximum quantity of items.
+
+    Returns:
+        mean (float)
+        variance (float)
+    """
+
+    if minimum == maximum:
+        return minimum, 0
+
+    mode = (minimum + maximum) / 2
+    variance = (minimum ** 2 + maximum ** 2 + mode ** 2 - minimum * maximum - minimum * mode - maximum * mode) / 18
+    return mode, variance + 1 / 12     # Rounding adds the variance of a uniform error of ±0.5.
+
+def triangular_quantile(minimum: float, maximum: float, p: float):
+    """
+    Args:
+        minimum (float): Minimum of the triangular distribution; the mode is in the middle.
+        maximum (float): Maximum of the triangular distribution.
+        p (float): Quantile, between 0 and 1.
+
+    Returns:
+        value (float)
+    """
+
+    width = maximum - minimum
+    if p <= 0.5:
+        return minimum + width * sqrt(p / 2)
+    return maximum - width * sqrt((1 - p) / 2)
+
+def attention_moments(scanning_time: float, minimum_cart_items: int, maximum_cart_items: int, dynamic_scanning_time: bool):
+    """
+    Mean and variance of the attention time of a customer (items in the cart × scanning time per item).
+
+    Args:
+        scanning_time (float): Average scanning time per item.
+        minimum_cart_items (int): Minimum quantity of items in a cart.
+        maximum_cart_items (int): Maximum quantity of items in a cart.
+        dynamic_scanning_time (bool): If True, the scanning time of each item is exponential, which adds variance.
+
+    Returns:
+        mean (float)
+        variance (float)
+    """
+
+    items_mean, items_variance = cart_moments(minimum_cart_items, maximum_cart_items)
+    variance = scanning_time ** 2 * items_variance
+    if dynamic_scanning_time:
+        variance += items_mean * scanning_time ** 2    # Variance of a sum of exponential scanning times.
+    return items_mean * scanning_time, variance
+
+def arrival_variability(mean_time: float, distribution: str):
+    """
+    Args:
+        mean_time (float): Average time between arrivals.
+        distribution (str): "exponential" or "poisson" (see arrival_time_distribution).
+
+    Returns:
+        scv (float): Squared coefficient of variation of the time between arrivals.
+    """
+
+    match distribution:
+        case "exponential" | "":
+            return 1
+        case "poisson":     # Variance equals the mean.
+            return 1 / mean_time
+        case _:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Distribución estadística no compatible para arrival_time_distribution.")
+
+def cashier_segments(cashier_quantity: object, start: float, end: float):
+    """
+    Split a period in segments with a constant quantity of cashiers. When the quantity of cashiers decreases, the change is delayed 1800 seconds, as in the simulation.
+
+    Args:
+        cashier_quantity (int|list): Fixed quantity of cashiers or schedule; format is [[t1, n1], [t2, n2], …, [tn, n]].
+        start (float): Start of the period.
+        end (float): End of the period.
+
+    Returns:
+        segments (list): (duration, cashiers) of each segment.
+    """
+
+    if isinstance(cashier_quantity, int):
+        return [(end - start, cashier_quantity)]
+
+    schedule = [[t, n] for t, n in cashier_quantity]
+    for i in range(0, len(schedule) - 1):
+        if schedule[i][1] - schedule[i + 1][1] > 0:
+            schedule[i + 1][0] += 1800
+    times = [t for t, _ in schedule]
+
+    segments = []
+    t = start
+    while t < end:
+        i = bisect_right(times, t) - 1
+        n = schedule[i][1] if i >= 0 else 0
+        t_end = min(end, times[i + 1]) if i + 1 < len(times) else end
+        segments.append((t_end - t, n))
+        t = t_end
+    return segments
+
+def queue_lengths(arrival_rate: float, cashiers: int, load: float, wait_probability: float, waiting_mean: float):
+    """
+    Distribution of the queue length of a cashier as it is sampled in the simulation: customers in the queue of the cashier, including the one being attended, sampled only when the queue is not empty.
+    Customers choose the shortest queue, so the customers in the supermarket are assumed to be balanced among the cashiers. The quantity of customers in the supermarket follows the M/M/c distribution below c (scaled to 1 - P(wait)) and a geometric distribution from c whose mean is the mean quantity of waiting customers of Allen–Cunneen (arrival rate × mean waiting time).
+
+    Args:
+        arrival_rate (float): Customers per second.
+        cashiers (int): Quantity of open cashiers.
+        load (float): Offered load: arrival rate × average attention time.
+        wait_probability (float): Probability that a customer has to wait.
+        waiting_mean (float): Mean waiting time of all the customers, in seconds.
+
+    Returns:
+        lengths (dict): Probability of each length of the queue of a cashier, given that it is not empty.
+    """
+
+    lengths = defaultdict(float)
+
+    logs = [n * log(load) - lgamma(n + 1) for n in range(cashiers)]    # Customers in the supermarket below c, without normalizing.
+    largest = max(logs)
+    weights = [exp(l - largest) for l in logs]
+    total = sum(weights)
+    for n, weight in enumerate(weights):
+        if n > 0:   # n cashiers have 1 customer; the rest are empty.
+            lengths[1] += (1 - wait_probability) * weight / total * n / cashiers
+
+    waiting_customers = arrival_rate * waiting_mean
+    ratio = waiting_customers / (wait_probability + waiting_customers)  # Geometric distribution of the customers waiting.
+    probability = wait_probability * (1 - ratio)
+    remaining = wait_probability
+    n = cashiers
+    while remaining > 1e-9 and probability > 0:
+        q, r = divmod(n, cashiers)  # r cashiers have q + 1 customers; the rest have q.
+        lengths[q + 1] += probability * r / cashiers
+        lengths[q] += probability * (cashiers - r) / cashiers
+        remaining -= probability
+        probability *= ratio
+        n += 1
+
+    lengths.pop(0, None)
+    total = sum(lengths.values())
+    return {length: p / total for length, p in lengths.items()}
+
+def distribution_summary(probabilities: dict):
+    """
+    Args:
+        probabilities (dict): Probability of each value of a discrete distribution.
+
+    Returns:
+        summary (tuple): Mean, standard deviation and quantiles of the distribution.
+    """
+
+    mean = sum(value * p for value, p in probabilities.items())
+    deviation = sqrt(max(sum(value ** 2 * p for value, p in probabilities.items()) - mean ** 2, 0))
+
+    summary = [mean, deviation]
+    values = sorted(probabilities)
+    for q in quantiles:
+        cumulative = 0
+        for value in values:
+            cumulative += probabilities[value]
+            if cumulative >= q - 1e-12:
+                break
+        summary.append(value)
+    return tuple(summary)
+
+def queue_summary(arrival_rate: float, cashiers: int, attention_mean: float, attention_scv: float, arrival_scv: float):
+    """
+    Waiting time, queue length and utilization of a G/G/c queue in steady state (Allen–Cunneen approximation). The waiting time is 0 with probability 1 - P(wait) and exponential otherwise; the queue length is the one of a cashier, as it is sampled in the simulation (see queue_lengths()).
+
+    Args:
+        arrival_rate (float): Customers per second.
+        cashiers (int): Quantity of open cashiers.
+        attention_mean (float): Average attention time, in seconds.
+        attention_scv (float): Squared coefficient of variation of the attention time.
+        arrival_scv (float): Squared coefficient of variation of the time between arrivals.
+
+    Returns:
+        summary (tuple): Mean, standard deviation and quantiles of the waiting time, the same of the queue length of a cashier, and the utilization. Values are infinite if the cashiers cannot attend all the customers.
+    """
+
+    if arrival_rate == 0:
+        return (0,) * (2 * (2 + len(quantiles))) + (0,)
+    if cashiers == 0 or arrival_rate * attention_mean >= cashiers:
+        return (infinite,) * (2 * (2 + len(quantiles))) + (infinite if cashiers == 0 else arrival_rate * attention_mean / cashiers,)
+
+    load = arrival_rate * attention_mean
+    wait_probability = erlang_c(cashiers, load)
+    rate = (cashiers / attention_mean - arrival_rate) * 2 / (arrival_scv + attention_scv)    # Rate of the exponential waiting time of the customers who wait.
+
+    mean = wait_probability / rate
+    deviation = sqrt(max(2 * wait_probability / rate ** 2 - mean ** 2, 0))
+    waits = tuple(max(0, log(wait_probability / (1 - p)) / rate) for p in quantiles)
+
+    lengths = distribution_summary(queue_lengths(arrival_rate, cashiers, load, wait_probability, mean))
+    return (mean, deviation) + waits + lengths + (load / cashiers,)
+
+def estimate(arrival_time: list, cashier_quantity: object, scanning_time: float, minimum_cart_items = 1, maximum_cart_items = 100,
+             dynamic_scanning_time = False, arrival_time_distribution = "poisson", walk_time = 0):
+    """
+    Estimate the statistics of each period of the arrival distribution without simulating. Periods where the quantity of cashiers changes are split in segments and their values are averaged by duration.
+
+    Args:
+        arrival_time (list): Arrival distribution; format is [[t1, arrival_time], [t2, arrival_time], …, [tn, arrival_time]] (e.g. market.Popular_Hours.saturday). An average arrival time of 0 means no arrivals.
+        cashier_quantity (int|list): Fixed quantity of cashiers or schedule (e.g. market.Quartiles.saturday).
+        scanning_time (float): Average scanning time per item.
+        minimum_cart_items (int): Minimum quantity of items in a cart.
+        maximum_cart_items (int): Maximum quantity of items in a cart.
+        dynamic_scanning_time (bool): If True, the scanning time of each item is exponential.
+        arrival_time_distribution (str): "exponential" or "poisson".
+        walk_time (float): Seconds added to every waiting time: the time a customer walks in the queue lane to the cashier even if nobody is in front ("Tiempo fila" of the simulation includes it). Default is 0.
+
+    Returns:
+        rows (list): One tuple per period (except the last one, which has no end), with the values of columns.
+    """
+
+    attention_mean, attention_variance = attention_moments(scanning_time, minimum_cart_items, maximum_cart_items, dynamic_scanning_time)
+    attention_scv = attention_variance / attention_mean ** 2 if attention_mean > 0 else 0
+
+    if dynamic_scanning_time:   # Normal approximation.
+        attention = (attention_mean, sqrt(attention_variance)) + tuple(max(0, NormalDist(attention_mean, sqrt(attention_variance)).inv_cdf(p)) for p in quantiles)
+    else:
+        attention = (attention_mean, sqrt(attention_variance)) + tuple(scanning_time * triangular_quantile(minimum_cart_items, maximum_cart_items, p) for p in quantiles)
+
+    rows = []
+    for (t, mean_time), (t_end, _) in zip(arrival_time[:-1], arrival_time[1:]):
+        arrival_rate = 1 / mean_time if mean_time > 0 else 0
+        arrival_scv = arrival_variability(mean_time, arrival_time_distribution) if mean_time > 0 else 0
+
+        segments = cashier_segments(cashier_quantity, t, t_end)
+        duration = sum(d for d, _ in segments)
+        if duration == 0:   # Empty period: a row of zeros, so the rows are in the same order as the periods.
+            rows.append((t, t_end) + (0,) * (len(columns) - 2))
+            continue
+        values = [0] * (2 * (2 + len(quantiles)) + 1)
+        cashiers = 0
+        for d, n in segments:
+            summary = queue_summary(arrival_rate, n, attention_mean, attention_scv, arrival_scv)
+            values = [v + d / duration * s if s != infinite else infinite for v, s in zip(values, summary)]
+            cashiers += d / duration * n
+
+        waits, lengths, utilization = values[:2 + len(quantiles)], values[2 + len(quantiles):-1], values[-1]
+        if arrival_rate > 0:
+            waits = [waits[0] + walk_time, waits[1]] + [w + walk_time for w in waits[2:]]
+        rows.append((t, t_end) + tuple(waits) + tuple(lengths) + (attention if arrival_rate > 0 else (0,) * (2 + len(quantiles))) + (cashiers, utilization))
+
+    return rows
+
+def estimate_table(arrival_time: list, cashier_quantity: object, scanning_time: float, **options):
+    """
+    Same as estimate(), as a DataFrame. "Hora inicio" and "Hora fin" are timedeltas, as in the statistics of the simulation.
+
+    Returns:
+        table (object): DataFrame with columns.
+    """
+
+    table = pd.DataFrame(estimate(arrival_time, cashier_quantity, scanning_time, **options), columns=columns)
+    table["Hora inicio"] = pd.to_timedelta(table["Hora inicio"], unit="s")
+    table["Hora fin"] = pd.to_timedelta(table["Hora fin"], unit="s")
+    return table
+
+def environment_estimate(simulation: object, walk_time = None):
+    """
+    Estimate the statistics of each period with the parameters of an environment.
+
+    Args:
+        simulation (object): Environment whose parameters were defined; arrival_time must be a list (dynamic_arrival_time is True).
+        walk_time (float|None): See estimate(). If None, the time of a customer who does not wait in the layout of the environment: the steps from the main queue to the cashier (StoreLayout.queue_walk), one second to enter the lane and one to be called by the cashier.
+
+    Returns:
+        table (object): DataFrame (see estimate_table()).
+    """
+
+    if not simulation.dynamic_arrival_time:
+        raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} arrival_time debe ser una lista conteniendo las distribuciones.")
+
+    if walk_time is None:
+        walk_time = simulation.build_store().queue_walk + 2
+
+    return estimate_table(simulation.arrival_time, simulation.cashier_quantity, simulation.scanning_time, minimum_cart_items=simulation.minimum_cart_items, maximum_cart_items=simulation.maximum_cart_items,
+                          dynamic_scanning_time=simulation.dynamic_scanning_time, arrival_time_distribution=simulation.arrival_time_distribution, walk_time=walk_time)
+
+def calibration_report(simulation: object):
+    """
+    Compare the estimation with the statistics of a finished simulation, by period of the arrival distribution. Simulated waiting and attention times are calculated from the customers table, by arrival time; simulated queue lengths are the average of the rows of "cashier_per_hour" of the period with samples (cashiers whose queue was not empty).
+    The walk time of the estimation is calculated from the layout of the simulation (see environment_estimate()).
+
+    Args:
+        simulation (object): Environment after start().
+
+    Returns:
+        report (object): DataFrame with the estimated ("estimado") and simulated ("simulado") average waiting time, 90th percentile of the waiting time, average attention time, average queue length and 90th percentile of the queue length of each period, and the difference of the average waiting times.
+    """
+
+    customers = simulation.statistics["customers"]
+    cashier_per_hour = simulation.statistics["cashier_per_hour"]
+    table = environment_estimate(simulation)    # Row i is the period i of arrival_time.
+    starts = [t for t, _ in simulation.arrival_time]
+    periods = pd.Series([bisect_right(starts, t) - 1 for t in customers["Hora llegada"].dt.total_seconds()], index=customers.index)
+
+    simulated = {}
+    for i, rows in customers.groupby(periods):
+        simulated[i] = (rows["Tiempo fila"].mean(), rows["Tiempo fila"].quantile(0.9), rows["Tiempo atención"].mean(), len(rows) / customers["Iteración"].nunique())
+
+    sampled = cashier_per_hour[cashier_per_hour["Longitud promedio fila"] > 0]     # Rows without samples are 0.
+    lengths = {(start.total_seconds(), end.total_seconds()): (rows["Longitud promedio fila"].mean(), rows["Longitud fila p90"].mean()) for (start, end), rows in sampled.groupby(["Hora inicio", "Hora fin"])}
+    periods = [(start.total_seconds(), end.total_seconds()) for start, end in zip(table["Hora inicio"], table["Hora fin"])]
+
+    report = table[["Hora inicio", "Hora fin", "Cajeros", "Utilización"]].copy()
+    report["Clientes simulado"] = [simulated.get(i, (0, 0, 0, 0))[3] for i in range(len(table))]
+    for j, column in enumerate(["Tiempo promedio fila", "Tiempo fila p90", "Tiempo promedio atención"]):
+        report[f"{column} estimado"] = table[column]
+        report[f"{column} simulado"] = [simulated.get(i, (0, 0, 0, 0))[j] for i in range(len(table))]
+    for j, column in enumerate(["Longitud promedio fila", "Longitud fila p90"]):
+        report[f"{column} estimado"] = table[column]
+        report[f"{column} simulado"] = [lengths.get(period, (0, 0))[j] if end > start else 0 for period, (start, end) in zip(periods, periods)]
+    report["Diferencia tiempo promedio fila"] = report["Tiempo promedio fila estimado"] - report["Tiempo promedio fila simulado"]
+    return report
@@ -0,0 +1,107 @@
+## This module contains the random number generator used by the simulation.
+## Each iteration has its own generator, created from a seed, so the same seed always produces the same simulation.
+
+
+# Modules to use in this file:
+# numpy.random.default_rng (creates a numpy Generator from a seed) is imported when the first RandomStream is created, so importing the simulation does not load numpy.
+
+class RandomStream:
+    """
+    Random numbers of one iteration. Values are drawn from a numpy Generator in blocks and stored in buffers; when a buffer runs out, it is filled again. This avoids calling the generator for every single value.
+
+    Args:
+        seed_sequence (object): numpy.random.SeedSequence (or integer seed) of the iteration.
+        buffer_size (int): Quantity of values drawn each time a buffer is filled. Default is 1024.
+
+    Attributes:
+        generator (object): numpy.random.Generator.
+        buffers (dict): Drawn values and position of the next value to use, by kind of value.
+    """
+
+    def __init__(self, seed_sequence: object, buffer_size = 1024):
+        from numpy.random import default_rng
+        self.generator = default_rng(seed_sequence)
+        self.buffer_size = buffer_size
+        self.buffers = {}
+
+    def take(self, key: object, fill: object, n = 1):
+        """
+        Take the next n values of a buffer.
+
+        Args:
+            key (object): Name of the buffer.
+            fill (function): Function that receives a quantity and returns that quantity of new values (numpy array).
+            n (int): Quantity of values. Default is 1.
+
+        Returns:
+            values (list): List with n values.
+        """
+
+        buffer = self.buffers.get(key)
+        if buffer is None or buffer[1] + n > len(buffer[0]):
+            buffer = [fill(max(self.buffer_size, n)).tolist(), 0]   # Remaining values are discarded.
+            self.buffers[key] = buffer
+
+        position = buffer[1]
+        buffer[1] = position + n
+        return buffer[0][position:position + n]
+
+    def next(self, key: object, fill: object):
+        """
+        Take the next value of a buffer.
+
+        Args:
+            key (object): Name of the buffer.
+            fill (function): Function that receives a quantity and returns that quantity of new values (numpy array).
+
+        Returns:
+            value (float|int)
+        """
+
+        buffer = self.buffers.get(key)
+        if buffer is None or buffer[1] == len(buffer[0]):
+            buffer = [fill(self.buffer_size).tolist(), 0]
+            self.buffers[key] = buffer
+
+        value = buffer[0][buffer[1]]
+        buffer[1] += 1
+        return value
+
+    def uniform(self):
+        """
+        Returns:
+            value (float): Random number between 0 and 1.
+        """
+
+        return self.next("uniform", self.generator.random)
+
+    def exponential_sum(self, mean: float, n: int):
+        """
+        Sum of n exponential random numbers, e.g. the time to scan n items.
+
+        Args:
+            mean (float): Mean of each exponential random number.
+            n (int): Quantity of random numbers.
+
+        Returns:
+            value (float)
+        """
+
+        return mean * sum(self.take("standard_exponential", self.generator.standard_exponential, n))
+
+    def cart_size(self, minimum: int, maximum: int):
+        """
+        Quantity of items in a cart, using a triangular distribution with the mode in the middle of minimum and maximum.
+
+        Args:
+            minimum (int): Minimum quantity of items.
+            maximum (int): Maximum quantity of items.
+
+        Returns:
+            value (int)
+        """
+
+        if minimum == maximum:
+            return minimum
+
+        return self.next(("cart_size", minimum, maximum), lambda size: self.generator.triangular(minimum, (minimum + maximum) / 2, maximum, size).round().astype(int))
@@ -0,0 +1,117 @@
+## This module contains the buffer used to collect the statistics of the simulation while it runs.
+## It replaces the row by row appends to pandas DataFrames (each append copies the whole DataFrame). The dropped ".deprecated/loger.py" stored Python lists and checked types in every entry; this buffer stores typed arrays with preallocated space instead.
+
+
+# Modules to use in this file:
+from array import array     # Typed arrays of numbers.
+import colors               # Custom module: Allows to modify printed text.
+# numpy and pandas are imported in to_dataframe(), so the simulation only loads them when the tables are created.
+
+class RecordBuffer:
+    """
+    Table stored by columns in typed arrays. Space is reserved in chunks, so adding a row only writes a number in each column.
+    Times are stored as seconds; they are converted to timedelta when the DataFrame is created.
+
+    Args:
+        columns (dict): Name and data type of each column, in order. Valid data types are "int64", "float64" and "timedelta64[s]" (seconds).
+        chunk_size (int): Quantity of rows reserved each time the buffer is full. Default is 4096.
+
+    Attributes:
+        columns (dict): Name and data type of each column.
+        data (list): One typed array per column.
+        size (int): Quantity of rows in the buffer.
+        capacity (int): Quantity of rows that can be added before reserving another chunk.
+    """
+
+    typecodes = {"int64": "q", "float64": "d", "timedelta64[s]": "q"}
+
+    def __init__(self, columns: dict, chunk_size = 4096):
+        for name, dtype in columns.items():
+            if dtype not in self.typecodes:
+                raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Tipo de dato {dtype} no compatible para la columna \"{name}\".")
+
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.data = [array(self.typecodes[dtype]) for dtype in columns.values()]
+        self.size = 0
+        self.capacity = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        # Only the rows are copied when the buffer is sent to another process (pickle), not the reserved space.
+        state = self.__dict__.copy()
+        state["data"] = [column[:self.size] for column in self.data]
+        state["capacity"] = self.size
+        return state
+
+    def reserve(self):
+        """
+        Reserve space for another chunk of rows in every column.
+        """
+
+        for column in self.data:
+            column.frombytes(bytes(column.itemsize * self.chunk_size))
+        self.capacity += self.chunk_size
+
+    def append(self, row: tuple|list):
+        """
+        Add a row at the end of the buffer.
+
+        Args:
+            row (tuple|list): One value per column, in the same order as the columns. Times must be given in seconds.
+        """
+
+        if self.size == self.capacity:
+            self.reserve()
+
+        n = self.size
+        for column, value in zip(self.data, row):
+            column[n] = value
+        self.size = n + 1
+
+    def extend(self, other: object):
+        """
+        Add all the rows of another buffer with the same columns.
+
+        Args:
+            other (object): RecordBuffer to copy.
+        """
+
+        if other.columns != self.columns:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Las columnas de los registros no coinciden.")
+
+        while self.capacity - self.size < other.size:
+            self.reserve()
+
+        for column, other_column in zip(self.data, other.data):
+            column[self.size:self.size + other.size] = other_column[:other.size]
+        self.size += other.size
+
+    def clear(self):
+        """
+        Remove all the rows. The reserved space is kept.
+        """
+
+        self.size = 0
+
+    def to_dataframe(self):
+        """
+        Create a pandas DataFrame with the rows in the buffer.
+
+        Returns:
+            df (object): DataFrame with one column per buffer column. Columns "timedelta64[s]" are converted to timedelta.
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        d = {}
+        for (name, dtype), column in zip(self.columns.items(), self.data):
+            values = np.frombuffer(column, dtype=np.dtype(self.typecodes[dtype]), count=self.size).copy()
+            if dtype == "timedelta64[s]":
+                values = values.astype("timedelta64[s]")
+            d[name] = values
+
+        return pd.DataFrame(data=d)
@@ -0,0 +1,166 @@
+## This module contains the cache of the results of complete simulations.
+## The statistics tables of a simulation with a seed are saved in a folder named by a hash of the parameters that change its results, the seed and the version of the simulator (a hash of its source code). Running the simulation again with the same parameters reads the tables instead of simulating.
+## Tables are saved by columns in numpy files (.npz); the least recently used results are removed when the cache is bigger than its maximum size.
+
+
+# Modules to use in this file:
+import hashlib      # Key of each result.
+import json
+import os
+import shutil       # Removes the folders of old results.
+# numpy and pandas are imported when a result is read or saved.
+
+unkeyed_parameters = ("print_animation", "time_scale", "frames_per_second", "workers", "check_invariants", "export_format", "export_chunk_size", "profile",
+                      "checkpoint_interval", "checkpoint_times", "checkpoint_file", "result_cache", "result_cache_size", "bypass_cache")    # Parameters that do not change the statistics; every other parameter of the environment is part of the key.
+
+source_files = ("environment.py", "entities.py", "functions.py", "elements.py", "randomness.py", "records.py", "metrics.py", "layout.py")     # Modules that simulate; a change in any of them is a new version.
+
+def simulator_version(files = source_files):
+    """
+    Args:
+        files (tuple): Modules whose source code is hashed. Default is source_files, the modules that simulate.
+
+    Returns:
+        version (str): Hash of the source code of the modules.
+    """
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in files:
+        with open(os.path.join(folder, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+def normalize(value: object):
+    """
+    Convert a parameter to a value that is written the same in JSON no matter how it was given, e.g. (1, 2) and [1, 2], or 4 and 4.0.
+
+    Args:
+        value (object): Value of a parameter.
+
+    Returns:
+        value (object)
+    """
+
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+class ResultCache:
+    """
+    Folder with the statistics of finished simulations.
+
+    Args:
+        folder (str): Path of the folder. It is created if it does not exist.
+        max_bytes (int): Maximum size of the cache. When a result is saved, the least recently used results are removed until the cache fits.
+
+    Attributes:
+        version (str): Version of the simulator included in every key.
+    """
+
+    def __init__(self, folder: str, max_bytes: int):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.version = simulator_version()
+        os.makedirs(folder, exist_ok=True)
+
+    def key(self, environment: object):
+        """
+        Args:
+            environment (object): Environment whose parameters were defined.
+
+        Returns:
+            key (str): Hash of the parameters of the environment (except the ones in unkeyed_parameters), its size, the layout of the supermarket and the version of the simulator.
+        """
+
+        parameters = {name: normalize(value) for name, value in environment.current_parameters().items() if name not in unkeyed_parameters}
+        parameters["width"] = environment.width
+        parameters["height"] = environment.height
+        parameters["layout"] = environment.build_store().to_dict()   # The content of the layout file, not its path.
+        text = json.dumps({"parameters": parameters, "version": self.version}, sort_keys=True)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def load(self, key: str, columns: dict):
+        """
+        Read the statistics of a result. The result becomes the most recently used.
+
+        Args:
+            key (str): Key of the result.
+            columns (dict): Columns of each table (name and data type, see RecordBuffer).
+
+        Returns:
+            statistics (dict|None): One DataFrame per table. None if the result is not in the cache.
+        """
+
+        path = os.path.join(self.folder, key)
+        if not os.path.isdir(path):
+            return None
+
+        import numpy as np
+        import pandas as pd
+
+        statistics = {}
+        for table, table_columns in columns.items():
+            with np.load(os.path.join(path, f"{table}.npz")) as data:
+                d = {}
+                for name, dtype in table_columns.items():
+                    values = data[name]
+                    if dtype == "timedelta64[s]":
+                        values = values.astype("timedelta64[s]")
+                    d[name] = values
+            statistics[table] = pd.DataFrame(data=d)
+
+        os.utime(path)  # Time of the last use.
+        return statistics
+
+    def store(self, key: str, statistics: dict, columns: dict):
+        """
+        Save the statistics of a result and remove the least recently used results if the cache is too big.
+
+        Args:
+            key (str): Key of the result.
+            statistics (dict): One DataFrame per table.
+            columns (dict): Columns of each table (name and data type, see RecordBuffer).
+        """
+
+        import numpy as np
+
+        path = os.path.join(self.folder, key)
+        temporary = f"{path}.tmp"
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+
+        for table, table_columns in columns.items():
+            df = statistics[table]
+            arrays = {}
+            for name, dtype in table_columns.items():
+                if dtype == "timedelta64[s]":
+                    arrays[name] = df[name].dt.total_seconds().to_numpy().astype("int64")
+                else:
+                    arrays[name] = df[name].to_numpy().astype(dtype)
+            np.savez(os.path.join(temporary, f"{table}.npz"), **arrays)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temporary, path)     # The result is complete or it does not exist, even if the simulation stops while it is saved.
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used results until the cache is not bigger than max_bytes.
+        """
+
+        results = []
+        for key in os.listdir(self.folder):
+            path = os.path.join(self.folder, key)
+            if os.path.isdir(path) and not key.endswith(".tmp"):
+                size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+                results.append((os.path.getmtime(path), size, path))
+
+        total = sum(size for _, size, _ in results)
+        for _, size, path in sorted(results):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
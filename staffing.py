@@ -0,0 +1,300 @@
+## This module searches the cheapest cashier schedule whose waiting times meet a service level (e.g. the 90th percentile of "Tiempo fila" of every hour is 5 minutes or less).
+## Candidates are simulated without animation. All candidates receive the same seeds (common random numbers), so they are compared with the same customers, and candidates that are clearly too slow are rejected after a few iterations.
+## Usage:
+##     import staffing
+##     schedule = staffing.optimize_schedule(market.Quartiles.saturday, sla=300)
+
+
+# Modules to use in this file:
+from concurrent.futures import ProcessPoolExecutor  # Iterations of a candidate run in parallel processes.
+from contextlib import redirect_stdout  # Hides the messages printed by the simulation.
+from itertools import repeat
+import copy
+import io
+import colors       # Custom module: Allows to modify printed text.
+import environment  # Custom module: Simulation manager.
+import numpy as np
+import pandas as pd
+from numpy.random import SeedSequence
+from parameters import simulation_parameters
+
+def simulate_customers(simulation_parameters: dict, width: int, height: int, iteration: int, seed_sequence: object):
+    """
+    Run one iteration without animation and without printing messages. This function is executed by the parallel workers of StaffingOptimizer.
+
+    Args:
+        simulation_parameters (dict): Parameters of the simulation.
+        width (int): Width of the supermarket in tiles.
+        height (int): Height of the supermarket in tiles.
+        iteration (int): Iteration number, starting at 0.
+        seed_sequence (object): numpy.random.SeedSequence used to seed the random numbers of this iteration.
+
+    Returns:
+        customers (object): DataFrame with the customers of the iteration.
+    """
+
+    with redirect_stdout(io.StringIO()):
+        records, _ = environment.run_replication(simulation_parameters, width, height, iteration, seed_sequence)
+    return records["customers"].to_dataframe()
+
+class Candidate:
+    """
+    Result of the simulation of a schedule.
+
+    Args:
+        counts (tuple): Quantity of cashiers of each period of the schedule.
+        cost (float): Cashier hours of the schedule.
+
+    Attributes:
+        hourly_p90 (dict): Percentile of "Tiempo fila" of the customers that arrived in each hour (key is the hour of the day).
+        iterations (int): Quantity of iterations simulated.
+        feasible (bool): True if the percentile of every hour meets the service level.
+        rejected (bool): True if the candidate was rejected after the screening iterations.
+    """
+
+    def __init__(self, counts: tuple, cost: float):
+        self.counts = counts
+        self.cost = cost
+        self.hourly_p90 = {}
+        self.iterations = 0
+        self.feasible = False
+        self.rejected = False
+
+    def worst_hour(self):
+        """
+        Returns:
+            hour (int|None): Hour of the day with the highest percentile. None if there were no customers.
+        """
+
+        if len(self.hourly_p90) == 0:
+            return None
+        return max(self.hourly_p90, key=self.hourly_p90.get)
+
+class StaffingOptimizer:
+    """
+    Greedy search of the cheapest schedule: the period with the worst waiting time receives one more cashier until every hour meets the service level; then each period loses one cashier while the service level is still met (coordinate descent).
+
+    Args:
+        schedule (list): Base schedule; format is [[t1, n1], [t2, n2], …, [tn, n]] (e.g. market.Quartiles.saturday). Its times are kept; periods with 0 cashiers (e.g. the closing of the store) are not modified.
+        sla (float): Maximum percentile of "Tiempo fila" of each hour, in seconds.
+        quantile (float): Percentile of the service level, between 0 and 100. Default is 90.
+        base_parameters (dict): Parameters of the simulation. Default is parameters.simulation_parameters. If its seed is None, 0 is used.
+        iterations (int): Iterations simulated for a candidate that passes the screening.
+        screening_iterations (int): Iterations simulated before deciding if a candidate is rejected.
+        rejection_factor (float): A candidate is rejected after the screening if the percentile of an hour is greater than rejection_factor times sla.
+        minimum (int): Minimum quantity of cashiers of each period.
+        workers (int): Quantity of processes that run the iterations of a candidate. If it is 1, iterations run one after another in this process.
+        verbose (bool): If True, the result of each candidate is printed.
+
+    Attributes:
+        candidates (dict): Candidate simulated for each tuple of quantities.
+        maximum (int): Maximum quantity of cashiers of the layout.
+        executor (object): ProcessPoolExecutor shared by all the candidates when workers is greater than 1; it is created by the first simulation and closed when optimize() ends. None if it was not created.
+    """
+
+    def __init__(self, schedule: list, sla: float, quantile = 90, base_parameters: dict = simulation_parameters, iterations = 5, screening_iterations = 2,
+                 rejection_factor = 1.5, minimum = 1, workers = 1, verbose = True):
+        self.times = [t for t, _ in schedule]
+        self.adjustable = [i for i, (_, n) in enumerate(schedule) if n > 0]
+        self.base_counts = tuple(n for _, n in schedule)
+        self.sla = sla
+        self.quantile = quantile
+        self.iterations = iterations
+        self.screening_iterations = min(screening_iterations, iterations)
+        self.rejection_factor = rejection_factor
+        self.minimum = minimum
+        self.workers = workers
+        self.verbose = verbose
+
+        self.parameters = copy.deepcopy(base_parameters)
+        self.parameters.update(copy.deepcopy(environment.headless_parameters))
+        self.parameters["dynamic_cashier_generation"] = True
+        if self.parameters.get("seed") is None:
+            self.parameters["seed"] = 0
+        self.seed_sequences = SeedSequence(self.parameters["seed"]).spawn(iterations)    # The same seeds for every candidate.
+
+        simulation = environment.Environment()
+        simulation.define_parameters(self.parameters)
+        store = simulation.build_store()
+        self.width = store.width
+        self.height = store.height
+        self.maximum = len(store.lane_x_locations)    # Same limit as functions.generate_cashiers().
+        if self.minimum > self.maximum:
+            raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} La cantidad máxima de cajeros es {colors.Regular.bold}{self.maximum}{colors.Text.end}.")
+
+        self.candidates = {}
+        self.executor = None
+
+    def schedule(self, counts: tuple):
+        """
+        Args:
+            counts (tuple): Quantity of cashiers of each period.
+
+        Returns:
+            schedule (list): Schedule in the same format as market.Quartiles.
+        """
+
+        return [[t, n] for t, n in zip(self.times, counts)]
+
+    def cost(self, counts: tuple):
+        """
+        Args:
+            counts (tuple): Quantity of cashiers of each period.
+
+        Returns:
+            cost (float): Cashier hours of the schedule. The last period has no duration.
+        """
+
+        return sum(n * (t_end - t) for n, t, t_end in zip(counts, self.times, self.times[1:])) / 3600
+
+    def period(self, hour: int):
+        """
+        Args:
+            hour (int): Hour of the day.
+
+        Returns:
+            period (int): Index of the period of the schedule that contains the start of the hour.
+        """
+
+        i = 0
+        while i + 1 < len(self.times) and self.times[i + 1] <= hour * 3600:
+            i += 1
+        return i
+
+    def simulate(self, candidate: Candidate, iterations: range):
+        """
+        Simulate some iterations of a candidate and add their customers to it.
+
+        Args:
+            candidate (Candidate): Candidate to simulate.
+            iterations (range): Iteration numbers to simulate.
+
+        Returns:
+            customers (object): DataFrame with the customers of the iterations.
+        """
+
+        parameters = dict(self.parameters, cashier_quantity=self.schedule(candidate.counts))
+        seed_sequences = [self.seed_sequences[i] for i in iterations]
+
+        if self.workers > 1:
+            if self.executor is None:   # Processes are started once, not for every candidate.
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            replications = list(self.executor.map(simulate_customers, repeat(parameters), repeat(self.width), repeat(self.height), iterations, seed_sequences))
+        else:
+            replications = [simulate_customers(parameters, self.width, self.height, i, seed_sequence) for i, seed_sequence in zip(iterations, seed_sequences)]
+
+        candidate.iterations += len(iterations)
+        return pd.concat(replications, ignore_index=True)
+
+    def hourly_percentile(self, customers: object):
+        """
+        Args:
+            customers (object): DataFrame with the customers (see Environment.statistics["customers"]).
+
+        Returns:
+            hourly_p90 (dict): Percentile of "Tiempo fila" of the customers that arrived in each hour.
+        """
+
+        hours = (customers["Hora llegada"].dt.total_seconds() // 3600).astype("int64")
+        return {int(hour): float(np.percentile(waiting_times, self.quantile)) for hour, waiting_times in customers["Tiempo fila"].groupby(hours)}
+
+    def evaluate(self, counts: tuple):
+        """
+        Simulate a schedule, unless it was already simulated. The screening iterations are simulated first; the rest of the iterations are only simulated if the candidate is not rejected.
+
+        Args:
+            counts (tuple): Quantity of cashiers of each period.
+
+        Returns:
+            candidate (Candidate)
+        """
+
+        if counts in self.candidates:
+            return self.candidates[counts]
+
+        candidate = Candidate(counts, self.cost(counts))
+        customers = self.simulate(candidate, range(0, self.screening_iterations))
+        candidate.hourly_p90 = self.hourly_percentile(customers)
+
+        if any(p90 > self.rejection_factor * self.sla for p90 in candidate.hourly_p90.values()):
+            candidate.rejected = True
+        else:
+            if self.iterations > self.screening_iterations:
+                customers = pd.concat([customers, self.simulate(candidate, range(self.screening_iterations, self.iterations))], ignore_index=True)
+                candidate.hourly_p90 = self.hourly_percentile(customers)
+            candidate.feasible = all(p90 <= self.sla for p90 in candidate.hourly_p90.values())
+
+        self.candidates[counts] = candidate
+        if self.verbose:
+            worst_hour = candidate.worst_hour()
+            worst = f"{candidate.hourly_p90[worst_hour]:.0f} s a las {worst_hour}:00" if worst_hour is not None else "sin clientes"
+            state = f"{colors.Regular.green}cumple{colors.Text.end}" if candidate.feasible else f"{colors.Regular.red}{'rechazado' if candidate.rejected else 'no cumple'}{colors.Text.end}"
+            print(f"{'-'.join(str(n) for n in counts)}: {candidate.cost:.1f} horas cajero, peor p{self.quantile:g} {worst} ({candidate.iterations} iteraciones) {state}")
+        return candidate
+
+    def optimize(self):
+        """
+        Search the cheapest schedule that meets the service level.
+
+        Returns:
+            schedule (list): Schedule in the same format as market.Quartiles.
+        """
+
+        try:
+            counts = list(self.base_counts)
+            for i in self.adjustable:
+                counts[i] = self.minimum
+
+            # Greedy: one more cashier in the period of the worst hour until every hour meets the service level.
+            candidate = self.evaluate(tuple(counts))
+            while not candidate.feasible:
+                violations = {}
+                for hour, p90 in candidate.hourly_p90.items():
+                    i = self.period(hour)
+                    if p90 > self.sla and i in self.adjustable and counts[i] < self.maximum:
+                        violations[i] = max(violations.get(i, 0), p90)
+                if len(violations) == 0:
+                    raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} Ningún horario con hasta {colors.Regular.bold}{self.maximum}{colors.Text.end} cajeros cumple el nivel de servicio.")
+
+                counts[max(violations, key=violations.get)] += 1
+                candidate = self.evaluate(tuple(counts))
+
+            # Coordinate descent: remove cashiers while the service level is still met, starting with the longest periods.
+            improved = True
+            while improved:
+                improved = False
+                for i in sorted(self.adjustable, key=lambda i: self.times[i + 1] - self.times[i] if i + 1 < len(self.times) else 0, reverse=True):
+                    if counts[i] <= self.minimum:
+                        continue
+                    reduced = counts.copy()
+                    reduced[i] -= 1
+                    if self.evaluate(tuple(reduced)).feasible:
+                        counts = reduced
+                        improved = True
+        finally:
+            self.close()
+
+        return self.schedule(counts)
+
+    def close(self):
+        """
+        Stop the processes of the executor, if they were started.
+        """
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+def optimize_schedule(schedule: list, sla: float, **options):
+    """
+    Search the cheapest cashier schedule whose waiting times meet a service level. See StaffingOptimizer for the options.
+
+    Args:
+        schedule (list): Base schedule; format is [[t1, n1], [t2, n2], …, [tn, n]] (e.g. market.Quartiles.saturday).
+        sla (float): Maximum percentile of "Tiempo fila" of each hour, in seconds (e.g. 300 for 5 minutes).
+
+    Returns:
+        schedule (list): Schedule in the same format as market.Quartiles.
+    """
+
+    return StaffingOptimizer(schedule, sla, **options).optimize()
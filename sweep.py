@@ -0,0 +1,211 @@
+## This module runs a parameter sweep: the same simulation with many combinations of parameters (e.g. cashier schedules, scanning time or arrival profiles), without animation and in parallel processes.
+## The result of each scenario is saved in a cache folder as soon as it finishes, so a sweep that was stopped continues with the scenarios that were not finished. Results of a previous version of the simulator are not used.
+## Usage:
+##     import sweep
+##     results = sweep.run_sweep({"cashier_quantity": sweep.schedule_variants(market.Quartiles.saturday, [[2, 3], [4, 5, 6], [1], [0]]), "scanning_time": [3, 4]})
+
+
+# Modules to use in this file:
+from concurrent.futures import ProcessPoolExecutor, as_completed    # Scenarios run in parallel processes.
+from contextlib import redirect_stdout  # Hides the messages printed by the simulation.
+import copy
+import hashlib      # Name of the cache file of each scenario.
+import io
+import itertools
+import json
+import os
+import colors       # Custom module: Allows to modify printed text.
+import environment  # Custom module: Simulation manager.
+from result_cache import simulator_version, source_files    # Custom module: Hash of the source code of the simulator.
+import numpy as np
+import pandas as pd
+from parameters import simulation_parameters
+
+
+def expand_grid(grid: dict):
+    """
+    Create one scenario per combination of the values of a grid.
+
+    Args:
+        grid (dict): Values of each parameter to combine. Values can be a list (e.g. {"scanning_time": [3, 4]}) or a dictionary with a label per value (e.g. {"arrival_time": {"saturday": [...], "sunday": [...]}}); labels are shown in the results table instead of the value.
+
+    Returns:
+        scenarios (list): One dictionary per combination, with the label and the value of each parameter: {parameter: (label, value)}.
+    """
+
+    options = []
+    for key, values in grid.items():
+        if isinstance(values, dict):
+            options.append([(key, label, value) for label, value in values.items()])
+        else:
+            options.append([(key, label(value), value) for value in values])
+
+    return [{key: (name, value) for key, name, value in combination} for combination in itertools.product(*options)]
+
+def label(value: object):
+    """
+    Args:
+        value (object): Value of a parameter.
+
+    Returns:
+        label (object): The value if it is a number, text, boolean or None; otherwise its JSON text.
+    """
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return json.dumps(value)
+
+def schedule_variants(schedule: list, counts: list):
+    """
+    Create every cashier schedule that combines some quantities of cashiers in each period of a base schedule.
+
+    Args:
+        schedule (list): Base schedule; format is [[t1, n1], [t2, n2], …, [tn, n]] (e.g. market.Quartiles.saturday).
+        counts (list): Quantities of cashiers to try in each period of the schedule, e.g. [[2, 3], [4, 5, 6], [1], [0]].
+
+    Returns:
+        schedules (dict): Schedules with a label made of the quantity of each period (e.g. "2-5-1-0"), ready to be used as values of "cashier_quantity" in a grid.
+    """
+
+    if len(counts) != len(schedule):
+        raise Exception(f"{colors.Bold.red}Error:{colors.Text.end} counts debe tener una lista de cantidades por cada periodo del horario ({len(schedule)}).")
+
+    schedules = {}
+    for combination in itertools.product(*counts):
+        schedules["-".join(str(n) for n in combination)] = [[t, n] for (t, _), n in zip(schedule, combination)]
+    return schedules
+
+def scenario_key(parameters: dict, version: str):
+    """
+    Args:
+        parameters (dict): Complete parameters of a scenario.
+        version (str): Version of the simulator and of the indicators (see result_cache.simulator_version()).
+
+    Returns:
+        key (str): Hash of the parameters and the version; scenarios with the same parameters have the same key, until the source code of the simulator or of this module changes.
+    """
+
+    simulation = environment.Environment()
+    simulation.define_parameters(parameters)
+    parameters = dict(parameters, layout=simulation.build_store().to_dict())    # The content of the layout, not the path of its file or the StoreLayout object.
+    text = json.dumps({"parameters": parameters, "version": version}, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def scenario_kpis(statistics: dict, iterations: int):
+    """
+    Summarize the statistics of a scenario. Results are averages per iteration.
+
+    Args:
+        statistics (dict): Statistics of the simulation (Environment.statistics).
+        iterations (int): Quantity of iterations of the simulation.
+
+    Returns:
+        kpis (dict): Indicators of the scenario. Times are in seconds.
+    """
+
+    customers = statistics["customers"]
+    cashier_usage = statistics["cashier_usage"]
+
+    waiting_times = customers["Tiempo fila"].to_numpy(dtype=float)
+    open_seconds = (cashier_usage["Hora cierre"] - cashier_usage["Hora apertura"]).dt.total_seconds().clip(lower=0).sum()
+    busy_seconds = cashier_usage["Tiempo ocupado"].sum()
+    last_exit = customers.groupby("Iteración")["Hora salida"].max().dt.total_seconds()
+
+    return {
+        "Clientes": len(customers) / iterations,
+        "Tiempo promedio fila": waiting_times.mean() if len(waiting_times) > 0 else 0,
+        "Tiempo fila p90": np.percentile(waiting_times, 90) if len(waiting_times) > 0 else 0,
+        "Tiempo fila p99": np.percentile(waiting_times, 99) if len(waiting_times) > 0 else 0,
+        "Tiempo promedio atención": customers["Tiempo atención"].mean() if len(customers) > 0 else 0,
+        "Horas cajero": open_seconds / 3600 / iterations,
+        "Utilización cajeros": busy_seconds / open_seconds if open_seconds > 0 else 0,
+        "Hora última salida": last_exit.mean() if len(last_exit) > 0 else 0,
+    }
+
+def run_scenario(parameters: dict):
+    """
+    Run a complete simulation without animation. This function is executed by the parallel workers of run_sweep().
+
+    Args:
+        parameters (dict): Complete parameters of the scenario.
+
+    Returns:
+        kpis (dict): Indicators of the scenario (see scenario_kpis()).
+    """
+
+    simulation = environment.Environment()
+    simulation.define_parameters(parameters)
+    with redirect_stdout(io.StringIO()):
+        simulation.start()
+
+    if simulation.interrupted:  # Incomplete statistics must not be saved in the cache.
+        raise KeyboardInterrupt
+
+    return {k: float(v) for k, v in scenario_kpis(simulation.statistics, simulation.iterations).items()}
+
+def run_sweep(grid: object, base_parameters: dict = simulation_parameters, workers: int = None, cache_folder: str = "sweep_cache"):
+    """
+    Run one simulation per scenario, in parallel processes and without animation, and summarize each one.
+    Scenarios whose parameters were already simulated are read from the cache folder instead of being simulated again.
+
+    Args:
+        grid (dict|list): Parameters that replace the ones in base_parameters. A dictionary is expanded to every combination of its values (see expand_grid()); a list contains one dictionary of parameters per scenario.
+        base_parameters (dict): Parameters shared by all the scenarios. Default is parameters.simulation_parameters. If its seed is None, 0 is used, so all the scenarios receive the same random numbers and can be saved in the cache.
+        workers (int|None): Quantity of processes that run the scenarios. If None, one per CPU. If it is 1, scenarios run one after another in this process.
+        cache_folder (str|None): Folder where the result of each scenario is saved. If None, results are not saved.
+
+    Returns:
+        results (object): DataFrame with one row per scenario: the label of each parameter of the grid followed by the indicators of scenario_kpis().
+    """
+
+    if isinstance(grid, dict):
+        scenarios = expand_grid(grid)
+    else:
+        scenarios = [{key: (label(value), value) for key, value in overrides.items()} for overrides in grid]
+
+    parameters = []
+    for scenario in scenarios:
+        scenario_parameters = copy.deepcopy(base_parameters)
+        scenario_parameters.update({key: value for key, (_, value) in scenario.items()})
+        scenario_parameters.update(copy.deepcopy(environment.headless_parameters))
+        if scenario_parameters.get("seed") is None:
+            scenario_parameters["seed"] = 0
+        parameters.append(scenario_parameters)
+
+    version = simulator_version(source_files + ("sweep.py",))     # The indicators are calculated by scenario_kpis().
+    keys = [scenario_key(scenario_parameters, version) for scenario_parameters in parameters]
+    kpis = {}
+    if cache_folder is not None:
+        os.makedirs(cache_folder, exist_ok=True)
+        for key in set(keys):
+            path = os.path.join(cache_folder, f"{key}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as file:
+                    kpis[key] = json.load(file)["kpis"]
+
+    pending = {}    # Scenarios that are not in the cache; repeated scenarios are simulated once.
+    for key, scenario_parameters in zip(keys, parameters):
+        if key not in kpis:
+            pending[key] = scenario_parameters
+
+    def save(key: str, result: dict):
+        kpis[key] = result
+        if cache_folder is not None:
+            path = os.path.join(cache_folder, f"{key}.json")
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump({"parameters": json.loads(json.dumps(pending[key], default=str)), "kpis": result}, file, indent=4)
+            os.replace(f"{path}.tmp", path)     # The file is complete or it does not exist, even if the sweep is stopped while it is written.
+
+    if workers == 1:
+        for key, scenario_parameters in pending.items():
+            save(key, run_scenario(scenario_parameters))
+    elif len(pending) > 0:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_scenario, scenario_parameters): key for key, scenario_parameters in pending.items()}
+            for future in as_completed(futures):    # Each result is saved as soon as its scenario finishes.
+                save(futures[future], future.result())
+
+    rows = []
+    for scenario, key in zip(scenarios, keys):
+        rows.append({**{parameter: name for parameter, (name, _) in scenario.items()}, **kpis[key]})
+    return pd.DataFrame(rows)